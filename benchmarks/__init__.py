@@ -0,0 +1 @@
+"""Benchmarks for the import pipeline, run from the repository root with `python -m benchmarks.<name>`"""
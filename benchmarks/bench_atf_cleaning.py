@@ -0,0 +1,50 @@
+"""
+Measure how ATF cleaning scales with the number of worker processes.
+
+Usage:
+    python -m benchmarks.bench_atf_cleaning exports/*.json [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import time
+from typing import List
+from utils.json_reader import load_records
+from utils.atf_pool import AtfCleaningPool
+
+BATCH_SIZE = 100
+
+def bench_workers(records: List[dict], workers: int) -> float:
+    """Clean every batch of the corpus and return the elapsed time"""
+    batches = [records[idx:idx + BATCH_SIZE] for idx in range(0, len(records), BATCH_SIZE)]
+    start = time.perf_counter()
+    pool = AtfCleaningPool(workers)
+    try:
+        for _ in pool.clean_batches(batches):
+            pass
+    finally:
+        pool.close()
+    return time.perf_counter() - start
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    parser = argparse.ArgumentParser(description="Benchmark parallel ATF cleaning")
+    parser.add_argument("files", nargs="+", help="CDLI JSON exports used as corpus")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers,
+                        help="Worker counts to measure")
+    args = parser.parse_args()
+
+    records = []
+    for file_path in args.files:
+        records.extend(load_records(file_path))
+    print(f"Corpus: {len(records)} records, {cores} cores")
+
+    baseline = None
+    for workers in args.workers:
+        seconds = bench_workers(records, workers)
+        baseline = baseline or seconds
+        print(f"{workers:>3} workers: {seconds:8.2f}s  {len(records) / seconds:10.1f} records/s  "
+              f"speedup {baseline / seconds:.2f}x")
+
+if __name__ == "__main__":
+    main()
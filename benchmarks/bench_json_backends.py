@@ -0,0 +1,96 @@
+"""
+Compare the parse throughput of the installed JSON backends.
+
+NDJSON files are decoded line by line and arrays element by element with
+each backend. Single objects are always streamed with the standard library,
+so they are timed once for reference. The quick scan counting the records
+of each file when it is selected is timed as well, with its peak memory.
+
+Without files, a synthetic corpus is written as NDJSON, as a pretty-printed
+array and as a minified single-line array.
+
+Usage:
+    python -m benchmarks.bench_json_backends exports/*.ndjson [--repeat 3]
+    python -m benchmarks.bench_json_backends --count 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import List
+from benchmarks.corpus import write_corpus, FORMAT_NDJSON, FORMAT_ARRAY, FORMAT_MINIFIED
+from utils.json_backend import JsonBackend, available_backends, get_backend, BACKEND_JSON
+from utils.json_reader import (count_records, detect_format, iter_records, FORMAT_NDJSON as READER_NDJSON,
+                               FORMAT_ARRAY as READER_ARRAY)
+
+def bench_backend(file_paths: List[str], backend: JsonBackend, repeat: int) -> float:
+    """Return the best time of `repeat` passes over every file"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for file_path in file_paths:
+            for _ in iter_records(file_path, backend):
+                pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def report(file_paths: List[str], backends: List[str], repeat: int) -> None:
+    size = sum(os.path.getsize(file_path) for file_path in file_paths)
+    print(f"Corpus: {len(file_paths)} files, {size / 1e6:.1f} MB")
+    for name in backends:
+        seconds = bench_backend(file_paths, get_backend(name), repeat)
+        print(f"{name:>8}: {seconds:8.2f}s  {size / 1e6 / seconds:8.1f} MB/s")
+
+def report_counts(file_paths: List[str]) -> None:
+    """Time the quick scan of each file and trace the memory it holds at its peak"""
+    for file_path in file_paths:
+        tracemalloc.start()
+        start = time.perf_counter()
+        count = count_records(file_path)
+        seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = os.path.getsize(file_path)
+        print(f"{os.path.basename(file_path):>24}: {count:>8} records  {seconds:7.2f}s  "
+              f"{size / 1e6 / seconds:8.1f} MB/s  peak {peak / 1e6:6.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the JSON decoding backends")
+    parser.add_argument("files", nargs="*", help="CDLI JSON exports used as corpus")
+    parser.add_argument("--count", type=int, default=50000,
+                        help="Records of the synthetic corpora used when no file is given")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per backend, the best is kept")
+    args = parser.parse_args()
+
+    backends = list(available_backends())
+    print(f"Installed backends: {', '.join(backends)}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_paths = args.files
+        if not file_paths:
+            file_paths = []
+            for data_format, name in ((FORMAT_NDJSON, "corpus.ndjson"), (FORMAT_ARRAY, "corpus.json"),
+                                      (FORMAT_MINIFIED, "corpus.min.json")):
+                file_paths.append(os.path.join(tmp_dir, name))
+                write_corpus(file_paths[-1], args.count, data_format=data_format)
+
+        formats = {path: detect_format(path) for path in file_paths}
+        ndjson_paths = [path for path in file_paths if formats[path] == READER_NDJSON]
+        array_paths = [path for path in file_paths if formats[path] == READER_ARRAY]
+        object_paths = [path for path in file_paths if path not in ndjson_paths + array_paths]
+        if ndjson_paths:
+            print("NDJSON")
+            report(ndjson_paths, backends, args.repeat)
+        if array_paths:
+            print("Arrays")
+            report(array_paths, backends, args.repeat)
+        if object_paths:
+            print("Objects (standard library streaming)")
+            report(object_paths, [BACKEND_JSON], args.repeat)
+        print("Quick scan (record count)")
+        report_counts(file_paths)
+
+if __name__ == "__main__":
+    main()
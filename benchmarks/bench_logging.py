@@ -0,0 +1,97 @@
+"""
+Measure the cost of logging on the import thread.
+
+The per-call cost of a batch log line is timed with logging disabled and
+enabled, with f-string and %-style messages, through the queued application
+logger and through a synchronous file handler for reference. A complete
+import of a synthetic corpus is then timed with logging off and on.
+
+Usage:
+    python -m benchmarks.bench_logging [--calls 100000] [--count 5000]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Callable
+from benchmarks.corpus import write_corpus
+from utils.config_manager import DEFAULT_CONFIG
+from utils.logger import Logger
+from utils.record_source import FileRecordSource
+from database.processor import run_import, WRITE_ENGINE_BULK
+
+def _per_call(log: Callable[[int], None], calls: int) -> float:
+    """Nanoseconds per call of `log`"""
+    start = time.perf_counter()
+    for i in range(calls):
+        log(i)
+    return (time.perf_counter() - start) / calls * 1e9
+
+def _styles(logger: logging.Logger):
+    def f_string(i):
+        logger.info(f"Batch {i} processed: {100} records in {0.25:.2f}s")
+
+    def percent(i):
+        logger.info("Batch %d processed: %d records in %.2fs", i, 100, 0.25)
+
+    return {"f-string": f_string, "%-style": percent}
+
+def _sync_logger(log_dir: str) -> logging.Logger:
+    """The former setup: records written to the file by the logging thread itself"""
+    logger = logging.getLogger("bench-sync")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = RotatingFileHandler(os.path.join(log_dir, "sync.log"))
+    handler.setFormatter(logging.Formatter(
+        '%(asctime)s | %(levelname)-8s | %(filename)s:%(lineno)d | %(funcName)s | %(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+def bench_calls(calls: int, log_dir: str) -> None:
+    setups = [
+        ("disabled", lambda: Logger.configure(enabled=False)),
+        ("queued", lambda: Logger.configure(enabled=True, log_dir=log_dir, console=False)),
+        ("synchronous", lambda: _sync_logger(log_dir)),
+    ]
+    print(f"Per call ({calls} calls)")
+    for name, setup in setups:
+        logger = setup()
+        for style, log in _styles(logger).items():
+            print(f"{name:>12} {style:>8}: {_per_call(log, calls):10.0f} ns")
+        for handler in logger.handlers:
+            handler.close()
+    Logger.configure(enabled=False)
+
+def bench_import(count: int, tmp_dir: str, log_dir: str) -> None:
+    file_path = os.path.join(tmp_dir, "corpus.ndjson")
+    write_corpus(file_path, count)
+    print(f"Import of {count} records (bulk engine)")
+    for name, enabled in (("logging off", False), ("logging on", True)):
+        Logger.configure(enabled=enabled, log_dir=log_dir, console=False)
+        database_path = os.path.join(tmp_dir, f"bench_{enabled}.db")
+        start = time.perf_counter()
+        stats = run_import(database_path, [FileRecordSource(file_path)], write_engine=WRITE_ENGINE_BULK,
+                           pragmas=DEFAULT_CONFIG['import_pragmas'], atf_workers=1)
+        seconds = time.perf_counter() - start
+        if stats.error:
+            raise RuntimeError(f"Import failed: {stats.error}")
+        print(f"{name:>12}: {seconds:8.2f}s ({count / seconds:.1f} records/s)")
+    Logger.configure(enabled=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of logging")
+    parser.add_argument("--calls", type=int, default=100000, help="Log calls per measurement")
+    parser.add_argument("--count", type=int, default=5000, help="Records of the imported corpus, 0 skips it")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_dir = os.path.join(tmp_dir, "logs")
+        bench_calls(args.calls, log_dir)
+        if args.count:
+            bench_import(args.count, tmp_dir, log_dir)
+
+if __name__ == "__main__":
+    main()
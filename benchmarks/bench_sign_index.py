@@ -0,0 +1,87 @@
+"""
+Compare sign sequence queries answered by the sign n-gram index with a scan
+of every transliteration.
+
+Sequences of one to six signs are sampled from the database's own lines, so
+every query has at least one match. The index is built first if the database
+has none.
+
+Usage:
+    python -m benchmarks.bench_sign_index --db out.db [--queries 50] [--seed 1]
+"""
+import argparse
+import random
+import time
+from typing import List
+from database.engine import create_import_engine
+from database.sign_index import build_sign_index, find_sign_sequence, has_sign_index
+from utils.text_cleaner import sign_lines
+
+def sample_sequences(connection, count: int, seed: int) -> List[List[str]]:
+    """Random sign sequences taken from the transliterations"""
+    rng = random.Random(seed)
+    texts = [text for (text,) in connection.exec_driver_sql(
+        "SELECT cleaned_transliteration FROM inscription WHERE cleaned_transliteration IS NOT NULL")]
+    sequences = []
+    while texts and len(sequences) < count:
+        lines = list(sign_lines(rng.choice(texts)))
+        if not lines:
+            continue
+        _, signs = rng.choice(lines)
+        size = rng.randint(1, min(6, len(signs)))
+        start = rng.randint(0, len(signs) - size)
+        sequences.append(signs[start:start + size])
+    return sequences
+
+def scan(connection, sequence: List[str]) -> int:
+    """Inscriptions holding the sequence, found by reading every transliteration"""
+    size = len(sequence)
+    found = 0
+    for (text,) in connection.exec_driver_sql(
+            "SELECT cleaned_transliteration FROM inscription WHERE cleaned_transliteration IS NOT NULL"):
+        if any(signs[start:start + size] == sequence
+               for _, signs in sign_lines(text) for start in range(len(signs) - size + 1)):
+            found += 1
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sign sequence queries")
+    parser.add_argument("--db", required=True, help="Imported SQLite database")
+    parser.add_argument("--queries", type=int, default=50, help="Sequences queried through the index")
+    parser.add_argument("--scans", type=int, default=3, help="Sequences also answered by a full scan")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    engine = create_import_engine(args.db)
+    try:
+        with engine.begin() as connection:
+            if not has_sign_index(connection):
+                stats = build_sign_index(connection)
+                print(f"Index built in {stats.total_time:.2f}s: {stats.ngrams} n-grams, "
+                      f"{stats.postings} postings, {stats.bytes / 1024 / 1024:.1f} MiB")
+        with engine.connect() as connection:
+            sequences = sample_sequences(connection, args.queries, args.seed)
+            times = []
+            for sequence in sequences:
+                start = time.perf_counter()
+                find_sign_sequence(connection, sequence)
+                times.append(time.perf_counter() - start)
+            times.sort()
+            print(f"Index: {len(times)} queries, median {times[len(times) // 2] * 1000:.2f} ms, "
+                  f"slowest {times[-1] * 1000:.2f} ms")
+
+            for sequence in sequences[:args.scans]:
+                start = time.perf_counter()
+                scanned = scan(connection, sequence)
+                scan_time = time.perf_counter() - start
+                start = time.perf_counter()
+                indexed = len(find_sign_sequence(connection, sequence))
+                index_time = time.perf_counter() - start
+                print(f"{' '.join(sequence):<30} scan {scan_time * 1000:9.1f} ms  "
+                      f"index {index_time * 1000:7.2f} ms  ({indexed} inscriptions"
+                      f"{'' if indexed == scanned else f', scan found {scanned}'})")
+    finally:
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Measure the startup cost of the application.
+
+The modules imported by main.py are timed in a fresh interpreter with
+`python -X importtime`, the slowest ones are listed, and heavy modules that
+should only be loaded once an import runs are reported. When a display is
+available, the time until the main window is drawn is measured as well.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_MODULE = "gui.main_window"
+# Loaded on demand by the import itself, never needed to show the window
+LAZY_MODULES = ("sqlalchemy", "database")
+
+WINDOW_SCRIPT = """
+import time
+start = time.perf_counter()
+from gui.main_window import create_main_window
+root = create_main_window()
+root.update()
+print(time.perf_counter() - start)
+root.destroy()
+"""
+
+def import_times(module: str) -> Tuple[float, Dict[str, int]]:
+    """
+    Import a module in a fresh interpreter
+
+    Returns:
+        Tuple[float, Dict[str, int]]: Total import time in seconds and the
+        cumulative time of each imported module in microseconds
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(total)
+    return cumulative.get(module, 0) / 1e6, cumulative
+
+def window_time() -> float:
+    """Seconds until the main window is drawn, in a fresh interpreter"""
+    result = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], cwd=ROOT_DIR,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip())
+
+def lazy_modules_loaded(modules: List[str]) -> List[str]:
+    """Packages of LAZY_MODULES among the imported modules"""
+    return sorted({name.split(".")[0] for name in modules} & set(LAZY_MODULES))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the application startup")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters, the best time is kept")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules listed")
+    args = parser.parse_args()
+
+    runs = [import_times(STARTUP_MODULE) for _ in range(args.repeat)]
+    total, cumulative = min(runs, key=lambda run: run[0])
+    print(f"Import of {STARTUP_MODULE}: {total * 1000:.1f} ms (best of {args.repeat})")
+    print("Slowest modules (cumulative):")
+    for name, micros in sorted(cumulative.items(), key=lambda item: -item[1])[1:args.top + 1]:
+        print(f"{micros / 1000:10.1f} ms  {name}")
+
+    loaded = lazy_modules_loaded(list(cumulative))
+    print(f"Heavy modules loaded at startup: {', '.join(loaded) if loaded else 'none'}")
+
+    try:
+        seconds = min(window_time() for _ in range(args.repeat))
+        print(f"Main window drawn after {seconds * 1000:.1f} ms")
+    except subprocess.CalledProcessError:
+        print("No display available, window time not measured")
+
+if __name__ == "__main__":
+    main()
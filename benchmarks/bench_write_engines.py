@@ -0,0 +1,43 @@
+"""
+Compare the ORM and bulk write engines on the same corpus.
+
+Usage:
+    python -m benchmarks.bench_write_engines exports/*.json [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+from typing import List
+from utils.json_reader import iter_records
+from utils.record_source import RecordSource
+from database.processor import run_import, WRITE_ENGINES
+from database.projection import project_records
+
+def bench_engine(sources: List[RecordSource], write_engine: str, repeat: int) -> float:
+    """Return the best time of `repeat` imports into a fresh database"""
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stats = run_import(os.path.join(tmp_dir, 'bench.db'), sources, write_engine=write_engine)
+        if stats.error or stats.failed_records:
+            raise RuntimeError(f"{write_engine} import failed: {stats.error or stats.failed_records}")
+        best = stats.total_time if best is None else min(best, stats.total_time)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the write engines")
+    parser.add_argument("files", nargs="+", help="CDLI JSON exports used as corpus")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine, the best is kept")
+    args = parser.parse_args()
+
+    sources = [RecordSource(file_path, list(project_records(iter_records(file_path)))) for file_path in args.files]
+    records = sum(len(source) for source in sources)
+    print(f"Corpus: {records} records from {len(args.files)} files")
+
+    timings = {engine: bench_engine(sources, engine, args.repeat) for engine in WRITE_ENGINES}
+    for engine, seconds in timings.items():
+        print(f"{engine:>5}: {seconds:8.2f}s  {records / seconds:10.1f} records/s")
+    print(f"Speedup (orm/bulk): {timings['orm'] / timings['bulk']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Check that parse_atf returns exactly what the original line-by-line cleaner
+returned.
+
+The original extract_cleaned_transliteration and extract_existing_translation
+are kept below as the reference. Random snippets are assembled from ATF
+fragments (line numbers, translation and comment lines, replacement
+sequences, logograms, unusual line breaks and whitespace), and the ATF of
+CDLI exports given on the command line is compared as well. Prints the first
+differences and exits with status 1 when there are any.
+
+Usage:
+    python -m benchmarks.check_atf_cleaner [exports/*.json] [--snippets 200000] [--seed 0]
+"""
+import argparse
+import random
+import re
+import sys
+from itertools import chain
+from typing import Iterator, Optional, Tuple
+from utils.json_reader import iter_records
+from utils.atf_pool import batch_atfs
+from utils.text_cleaner import parse_atf
+
+FRAGMENTS = (
+    "1.", "2'.", "#tr.en: ", "#tr.ts: ", "#tr.de:", "#tr.en", "#note", "&P123 = x", "@obverse",
+    "$ broken", "sz", "s,", "t,", "h", "_", "_dingir_", "a-na", "{d}", "x", ":", "",
+    "\n", "\r\n", "\r", " \n ", " ", "\t", "\x0b", "\x1c", "\x85", "\xa0", "　", "​", "﻿",
+)
+
+def _reference_replace_characters(text: str) -> str:
+    replacements = {
+        "sz": "š",
+        "s,": "ṣ",
+        "t,": "ṭ",
+        "h": "ḫ"
+    }
+    pattern = re.compile('|'.join(re.escape(k) for k in replacements))
+    text = pattern.sub(lambda m: replacements[m.group(0)], text)
+
+    return re.sub(r'_(.*?)_', lambda m: m.group(1).upper(), text)
+
+def _reference_transliteration(raw_atf: str) -> Optional[str]:
+    if not raw_atf:
+        return None
+
+    cleaned_lines = []
+    for line in raw_atf.splitlines():
+        stripped_line = line.strip()
+
+        if any(stripped_line.startswith(prefix) for prefix in ["#tr.", "&P", "#"]):
+            continue
+
+        cleaned_lines.append(_reference_replace_characters(stripped_line))
+
+    return "\n".join(cleaned_lines) if cleaned_lines else None
+
+def _reference_nearest_prefix(lines: list, current_index: int) -> Optional[str]:
+    for i in range(current_index - 1, -1, -1):
+        if not lines[i].strip().startswith("#"):
+            return re.split(r'\s+', lines[i].strip())[0]
+    return None
+
+def _reference_translation(raw_atf: str) -> Optional[str]:
+    if not raw_atf:
+        return None
+
+    translation_lines = []
+    raw_atf_lines = raw_atf.splitlines()
+
+    for i, line in enumerate(raw_atf_lines):
+        stripped_line = line.strip()
+
+        if stripped_line.startswith("#tr.") and not stripped_line.startswith("#tr.ts:"):
+            nearest_prefix = _reference_nearest_prefix(raw_atf_lines, i)
+            if nearest_prefix:
+                cleaned_translation = stripped_line.split(":", 1)[1].strip()
+                translation_lines.append(f"{nearest_prefix} {cleaned_translation}")
+
+    return "\n".join(translation_lines) if translation_lines else None
+
+def _outcome(function, raw_atf: str) -> Tuple:
+    """Return value of the function, or the type of the exception it raised"""
+    try:
+        return tuple(function(raw_atf))
+    except Exception as error:
+        return (type(error),)
+
+def reference(raw_atf: str) -> Tuple[Optional[str], Optional[str]]:
+    """Cleaned transliteration and translation as the original cleaner returned them"""
+    return _reference_transliteration(raw_atf), _reference_translation(raw_atf)
+
+def snippets(count: int, seed: int) -> Iterator[str]:
+    """Random ATF snippets of up to 25 fragments"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 25)))
+
+def export_atfs(files) -> Iterator[str]:
+    """Raw ATF of every record of the given exports"""
+    for file_path in files:
+        for record in iter_records(file_path):
+            atf = batch_atfs([record])[0]
+            if atf:
+                yield atf
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare parse_atf with the original ATF cleaner")
+    parser.add_argument("files", nargs="*", help="CDLI JSON exports whose ATF is compared too")
+    parser.add_argument("--snippets", type=int, default=200000, help="Random snippets compared")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--show", type=int, default=5, help="Differences printed at most")
+    args = parser.parse_args()
+
+    checked = 0
+    differences = 0
+    for raw_atf in chain(snippets(args.snippets, args.seed), export_atfs(args.files)):
+        checked += 1
+        expected = _outcome(reference, raw_atf)
+        actual = _outcome(parse_atf, raw_atf)
+        if expected != actual:
+            differences += 1
+            if differences <= args.show:
+                print(f"{raw_atf!r}\n  original:   {expected}\n  parse_atf:  {actual}")
+
+    print(f"{checked} ATF texts checked, {differences} differences")
+    sys.exit(1 if differences else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Seeded generator of synthetic CDLI-shaped artifact records.
+
+Usage:
+    python -m benchmarks.corpus corpus.ndjson --count 100000 [--seed 1] [--format array|minified]
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, Iterator, List
+
+FORMAT_NDJSON = 'ndjson'
+FORMAT_ARRAY = 'array'
+FORMAT_MINIFIED = 'minified'  # An array on a single line, as most exports are written
+
+PERIODS = ["Uruk IV", "Uruk III", "ED I-II", "ED IIIa", "ED IIIb", "Old Akkadian", "Lagash II",
+           "Ur III", "Early Old Babylonian", "Old Babylonian", "Old Assyrian", "Middle Babylonian",
+           "Middle Assyrian", "Neo-Assyrian", "Neo-Babylonian", "Achaemenid", "Hellenistic"]
+LANGUAGES = ["Sumerian", "Akkadian", "Elamite", "Hittite", "Hurrian", "Ugaritic", "Aramaic", "undetermined"]
+GENRES = ["Administrative", "Legal", "Letter", "Lexical", "Literary", "Mathematical", "Royal/Monumental",
+          "Scientific", "School", "Ritual", "Omen", "Astronomical", "Uncertain"]
+MATERIALS = ["clay", "stone", "metal", "shell", "bone", "ivory", "glass", "wood", "lapis lazuli"]
+SITES = ["Umma", "Girsu", "Nippur", "Ur", "Uruk", "Drehem", "Adab", "Shuruppak", "Kish", "Sippar",
+         "Babylon", "Larsa", "Mari", "Nineveh", "Assur", "Kanesh", "Susa", "Ebla"]
+SIGNS = ["a", "na", "ba", "ka", "ki", "lu", "szu", "s,a", "t,e", "hu", "ha", "ni", "ir", "ra", "ta", "tum",
+         "ma", "mu", "e2", "du3", "ga", "gu4", "u4", "ab", "zu", "li", "i3", "in", "an", "dumu", "sze"]
+LOGOGRAMS = ["_dingir_", "_lugal_", "_e2_", "_dumu_", "_kug-babbar_", "_sze_", "_udu_", "_gin2_"]
+WORDS = ["barley", "silver", "sheep", "the king", "the god", "his son", "received", "delivered",
+         "month", "year", "temple", "field", "witness", "seal", "for", "of"]
+
+def _lookup_pool(names: List[str], key: str) -> List[Dict]:
+    """Lookup entities numbered from 1, each id always carrying the same values"""
+    return [{"id": index, key: name} for index, name in enumerate(names, start=1)]
+
+class CorpusGenerator:
+    """
+    Builds reproducible records with the nested layout of CDLI exports:
+    lookup entities are drawn from shared pools, so that references repeat
+    across artifacts like in the real catalogue, always with the same
+    values for a given id.
+    """
+
+    def __init__(self, count: int, seed: int = 0):
+        self.count = count
+        self.random = random.Random(seed)
+        self.publications = [
+            {"id": i, "designation": f"Publication {i}", "bibtexkey": f"Author{i}{1900 + i % 120}",
+             "year": str(1900 + i % 120), "address": None, "number": str(i % 50), "publisher": "Publisher",
+             "title": f"Cuneiform Texts {i}", "series": f"Series {i % 40}"}
+            for i in range(1, max(10, min(20000, count // 20)) + 1)]
+        self.collections = [{"id": i, "collection": f"Museum {i}", "collection_url": f"https://museum{i}.example"}
+                            for i in range(1, 301)]
+        self.proveniences = [{"id": i, "provenience": f"{SITES[i % len(SITES)]} (mod. site {i})",
+                              "location_id": i, "place_id": i, "region_id": i % 20}
+                             for i in range(1, 501)]
+        self.external_resources = [{"id": i, "external_resource": f"Resource {i}", "base_url": "https://ext.example/",
+                                    "project_url": None, "abbrev": f"R{i}"} for i in range(1, 21)]
+        # Periods are listed in chronological order, which gives their sequence
+        self.periods = [dict(entity, sequence=entity["id"]) for entity in _lookup_pool(PERIODS, "period")]
+        self.materials = _lookup_pool(MATERIALS, "material")
+        self.languages = _lookup_pool(LANGUAGES, "language")
+        self.genres = _lookup_pool(GENRES, "genre")
+
+    def _atf(self, artifact_id: int) -> str:
+        lines = [f"&P{artifact_id:06d} = Text {artifact_id}", "#atf: lang sux", "@tablet", "@obverse"]
+        line_count = self.random.randint(2, 30)
+        for number in range(1, line_count + 1):
+            if number == line_count // 2 + 1:
+                lines.append("@reverse")
+            words = []
+            for _ in range(self.random.randint(1, 6)):
+                word = "-".join(self.random.choice(SIGNS) for _ in range(self.random.randint(1, 4)))
+                if self.random.random() < 0.2:
+                    word = self.random.choice(LOGOGRAMS)
+                if self.random.random() < 0.1:
+                    word = "{d}" + word
+                words.append(word)
+            lines.append(f"{number}. {' '.join(words)}")
+            if self.random.random() < 0.6:
+                lines.append(f"#tr.en: {' '.join(self.random.choice(WORDS) for _ in range(self.random.randint(2, 8)))}")
+            if self.random.random() < 0.05:
+                lines.append("#tr.ts: transcription")
+            if self.random.random() < 0.05:
+                lines.append("$ rest broken")
+        return "\n".join(lines)
+
+    def record(self, artifact_id: int) -> Dict:
+        rnd = self.random
+        inscription_id = artifact_id * 10 + 1
+        return {
+            "id": artifact_id,
+            "designation": f"Artifact {artifact_id}",
+            "composite_no": None if rnd.random() < 0.9 else f"Q{rnd.randint(1, 5000):06d}",
+            "artifact_type_comments": None,
+            "excavation_no": f"{rnd.choice(SITES)} {rnd.randint(1, 9999)}",
+            "museum_no": f"BM {rnd.randint(10000, 999999)}",
+            "findspot_comments": None,
+            "findspot_square": None if rnd.random() < 0.8 else f"{rnd.choice('ABCDEFGH')}{rnd.randint(1, 20)}",
+            "thickness": round(rnd.uniform(1, 40), 1),
+            "height": round(rnd.uniform(20, 200), 1),
+            "width": round(rnd.uniform(20, 150), 1),
+            # Keys present in CDLI exports but not used by the importer
+            "artifact_type": {"id": rnd.randint(1, 50), "artifact_type": "tablet"},
+            "is_public": True,
+            "is_atf_public": True,
+            "created": "2020-01-01T00:00:00+00:00",
+            "modified": "2023-06-01T00:00:00+00:00",
+            "retired": False,
+            "seal_no": None,
+            "surface_preservation": None,
+            "dates": [],
+            "inscription": {
+                "id": inscription_id,
+                "atf": self._atf(artifact_id),
+                "is_latest": True,
+                "annotation": None,
+            },
+            "publications": [
+                {"publication": rnd.choice(self.publications), "exact_reference": f"no. {rnd.randint(1, 500)}",
+                 "publication_type": "primary"}
+                for _ in range(rnd.randint(1, 3))],
+            "materials": [{"material": rnd.choice(self.materials)}],
+            "languages": [{"language": rnd.choice(self.languages)} for _ in range(rnd.randint(1, 2))],
+            "genres": [{"genre": rnd.choice(self.genres), "comments": None if rnd.random() < 0.7 else "comment"}],
+            "collections": [{"collection": rnd.choice(self.collections)}],
+            "external_resources": [
+                {"external_resource": rnd.choice(self.external_resources),
+                 "external_resource_key": str(rnd.randint(1, 10 ** 6))}
+                for _ in range(rnd.randint(0, 2))],
+            "period": rnd.choice(self.periods),
+            "provenience": rnd.choice(self.proveniences),
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for artifact_id in range(1, self.count + 1):
+            yield self.record(artifact_id)
+
+def generate_records(count: int, seed: int = 0) -> Iterator[Dict]:
+    """Yield `count` synthetic records, always the same ones for a given seed"""
+    return iter(CorpusGenerator(count, seed))
+
+def write_corpus(path: str, count: int, seed: int = 0, data_format: str = FORMAT_NDJSON) -> int:
+    """
+    Write a synthetic corpus to a file without keeping it in memory
+
+    Returns:
+        int: Size of the file in bytes
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        if data_format == FORMAT_ARRAY:
+            file.write("[\n")
+            for index, record in enumerate(generate_records(count, seed)):
+                if index:
+                    file.write(",\n")
+                file.write(json.dumps(record, ensure_ascii=False, indent=2))
+            file.write("\n]\n")
+        elif data_format == FORMAT_MINIFIED:
+            file.write("[")
+            for index, record in enumerate(generate_records(count, seed)):
+                if index:
+                    file.write(",")
+                file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+            file.write("]")
+        else:
+            for record in generate_records(count, seed):
+                file.write(json.dumps(record, ensure_ascii=False))
+                file.write("\n")
+    return os.path.getsize(path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic CDLI corpus")
+    parser.add_argument("path", help="Output file")
+    parser.add_argument("--count", type=int, default=1000, help="Number of artifacts")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--format", choices=(FORMAT_NDJSON, FORMAT_ARRAY, FORMAT_MINIFIED), default=FORMAT_NDJSON)
+    args = parser.parse_args()
+
+    size = write_corpus(args.path, args.count, args.seed, args.format)
+    print(f"Wrote {args.count} records ({size / 1e6:.1f} MB) to {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+End-to-end import benchmark on synthetic corpora.
+
+Each corpus size is generated with benchmarks.corpus, then the parse
+(json_reader, as streamed by FileRecordSource during an import), clean (text_cleaner)
+and write (process_record / BulkWriter) stages are timed separately,
+followed by a complete run_import. Results are printed and written as JSON.
+
+Usage:
+    python -m benchmarks.run --sizes 1000 10000 100000 --engines orm bulk --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import tempfile
+import time
+from itertools import islice
+from typing import Dict, Iterator, List
+from sqlalchemy.orm import sessionmaker
+from benchmarks.corpus import write_corpus, FORMAT_NDJSON, FORMAT_ARRAY
+from utils.json_reader import iter_records
+from utils.record_source import FileRecordSource
+from utils.text_cleaner import parse_atf
+from utils.atf_pool import batch_atfs
+from utils.config_manager import DEFAULT_CONFIG
+from database.tables_config import Base
+from database.engine import create_import_engine
+from database.entity_cache import EntityCache
+from database.bulk_writer import BulkWriter
+from database.processor import run_import, process_record, BATCH_SIZE, WRITE_ENGINE_BULK, WRITE_ENGINES
+
+def _batches(file_path: str) -> Iterator[List[dict]]:
+    records = iter_records(file_path)
+    while True:
+        batch = list(islice(records, BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
+
+def _stage(seconds: float, records: int, size_bytes: int = None) -> Dict:
+    result = {
+        "seconds": round(seconds, 4),
+        "records_per_second": round(records / seconds, 1) if seconds else None,
+    }
+    if size_bytes is not None:
+        result["mb_per_second"] = round(size_bytes / 1e6 / seconds, 2) if seconds else None
+    return result
+
+def bench_parse(file_path: str) -> float:
+    start = time.perf_counter()
+    for _ in iter_records(file_path):
+        pass
+    return time.perf_counter() - start
+
+def bench_clean(file_path: str) -> float:
+    """Time parse_atf only, the records are streamed from the file outside the timer"""
+    elapsed = 0.0
+    for batch in _batches(file_path):
+        atfs = [atf for atf in batch_atfs(batch) if atf]
+        start = time.perf_counter()
+        for atf in atfs:
+            parse_atf(atf)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+def bench_write(file_path: str, database_path: str, write_engine: str) -> float:
+    """Time the writers only, with the ATF cleaned beforehand outside the timer"""
+    engine = create_import_engine(database_path, DEFAULT_CONFIG['import_pragmas'])
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    elapsed = 0.0
+    with sessionmaker(bind=engine)() as session:
+        entity_cache = EntityCache()
+        bulk_writer = BulkWriter(entity_cache) if write_engine == WRITE_ENGINE_BULK else None
+        for batch in _batches(file_path):
+            cleaned_atfs = [parse_atf(atf) if atf else None for atf in batch_atfs(batch)]
+            start = time.perf_counter()
+            if bulk_writer:
+                for record, cleaned_atf in zip(batch, cleaned_atfs):
+                    bulk_writer.add_record(record, cleaned_atf)
+                bulk_writer.write(session.connection())
+            else:
+                for record, cleaned_atf in zip(batch, cleaned_atfs):
+                    process_record(session, record, entity_cache, cleaned_atf)
+                session.flush()
+            elapsed += time.perf_counter() - start
+        start = time.perf_counter()
+        session.commit()
+        elapsed += time.perf_counter() - start
+    engine.dispose()
+    return elapsed
+
+def bench_end_to_end(file_path: str, database_path: str, write_engine: str, atf_workers: int) -> Dict:
+    start = time.perf_counter()
+    source = FileRecordSource(file_path)
+    stats = run_import(database_path, [source], write_engine=write_engine,
+                       pragmas=DEFAULT_CONFIG['import_pragmas'], atf_workers=atf_workers)
+    seconds = time.perf_counter() - start
+    if stats.error or stats.failed_records:
+        raise RuntimeError(f"Import failed: {stats.error or stats.failed_records}")
+    return _stage(seconds, len(source))
+
+def run_size(count: int, engines: List[str], data_format: str, seed: int, atf_workers: int,
+             tmp_dir: str) -> List[Dict]:
+    file_path = os.path.join(tmp_dir, f"corpus_{count}.json")
+    size_bytes = write_corpus(file_path, count, seed, data_format)
+
+    parse = _stage(bench_parse(file_path), count, size_bytes)
+    clean = _stage(bench_clean(file_path), count)
+    results = []
+    for write_engine in engines:
+        database_path = os.path.join(tmp_dir, f"bench_{count}_{write_engine}.db")
+        write = _stage(bench_write(file_path, database_path, write_engine), count)
+        os.remove(database_path)
+        end_to_end = bench_end_to_end(file_path, database_path, write_engine, atf_workers)
+        os.remove(database_path)
+        results.append({
+            "records": count,
+            "file_bytes": size_bytes,
+            "format": data_format,
+            "write_engine": write_engine,
+            "stages": {"parse": parse, "clean": clean, "write": write, "end_to_end": end_to_end},
+        })
+        print(f"{count:>9} {write_engine:>5}  parse {parse['seconds']:8.2f}s ({parse['mb_per_second']} MB/s)"
+              f"  clean {clean['seconds']:8.2f}s  write {write['seconds']:8.2f}s"
+              f"  total {end_to_end['seconds']:8.2f}s ({end_to_end['records_per_second']} records/s)")
+    os.remove(file_path)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the import pipeline on synthetic corpora")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Corpus sizes")
+    parser.add_argument("--engines", nargs="+", choices=WRITE_ENGINES, default=list(WRITE_ENGINES))
+    parser.add_argument("--format", choices=(FORMAT_NDJSON, FORMAT_ARRAY), default=FORMAT_NDJSON)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--atf-workers", type=int, default=1, help="ATF workers for the end-to-end run")
+    parser.add_argument("--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--tmp-dir", default=None, help="Where corpora and databases are created")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp_dir:
+        for count in args.sizes:
+            results.extend(run_size(count, args.engines, args.format, args.seed, args.atf_workers, tmp_dir))
+
+    report = {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "batch_size": BATCH_SIZE,
+        "results": results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
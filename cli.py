@@ -0,0 +1,312 @@
+"""
+Command-line interface for headless imports.
+
+Usage:
+    python cli.py ingest --db out.db exports/*.json
+    python cli.py ingest --db out.db dumps/*.json.gz dumps/archive.zip
+    python cli.py export --db out.db --output parquet/ --artifacts
+    python cli.py search --db out.db "lugal-e"
+    python cli.py sign-index --db out.db
+    python cli.py signs --db out.db "{d}en-lil2"
+"""
+import argparse
+import glob
+import os
+import sys
+from typing import List, Optional
+from utils.file_scanner import scan_inputs
+from utils.input_files import expand_inputs
+from database.processor import run_import, WRITE_ENGINES, IMPORT_MODES, IMPORT_MODE_APPEND
+from database.imported_files import ImportedFiles
+from database.export import export_database, EXPORT_FORMATS, FORMAT_PARQUET, EXPORT_CHUNK_ROWS
+from database.fulltext import search_database, FTS_COLUMNS
+from database.sign_index import index_database, search_signs, sign_index_stale
+from utils.config_manager import load_config, DEFAULT_CONFIG
+from utils.metrics import default_metrics_path, DEFAULT_METRICS_DIR
+
+# Exit codes, so that scheduled runs can tell outcomes apart
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """Expand glob patterns that the shell left untouched (e.g. on Windows)"""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else []
+        paths.extend(matches or [pattern])
+    return paths
+
+def ingest(args: argparse.Namespace) -> int:
+    """Parse the given files and write them to the database"""
+    failed_files = 0
+    skipped_files = 0
+    # Each JSON member of a zip archive is imported as a file of its own
+    inputs = []
+    for file_path in expand_paths(args.files):
+        try:
+            inputs.extend(expand_inputs(file_path))
+        except Exception as e:
+            failed_files += 1
+            print(f"Failed to read {file_path}: {e}", file=sys.stderr)
+    # A replace import rebuilds the database, so only append imports can skip files.
+    # Unchanged files are recognised from their metadata before the scan; the
+    # content of the others is hashed once, by the scan workers.
+    imported_files = ImportedFiles()
+    if args.mode == IMPORT_MODE_APPEND and not args.force:
+        imported_files = ImportedFiles.load(args.db)
+    new_inputs = []
+    for input_file in inputs:
+        try:
+            if imported_files.is_unchanged(input_file.path, input_file.member):
+                skipped_files += 1
+                print(f"Skipping {input_file.display_name}: already imported")
+                continue
+        except Exception as e:
+            failed_files += 1
+            print(f"Failed to read {input_file.name}: {e}", file=sys.stderr)
+            continue
+        new_inputs.append(input_file)
+
+    # Records are decoded during the import, only the layout and count are read here,
+    # on several processes, the sources are then imported in the given order
+    scanned = {}
+    for input_file, source, error in scan_inputs(new_inputs, args.scan_workers):
+        if error is not None:
+            failed_files += 1
+            print(f"Failed to read {input_file.name}: {error}", file=sys.stderr)
+            continue
+        if imported_files.contains(source.fingerprint):
+            # A copy or a renamed file with the content of an imported one
+            skipped_files += 1
+            print(f"Skipping {input_file.display_name}: already imported")
+            continue
+        scanned[input_file] = source
+        print(f"Found {len(source)} records in {input_file.display_name}")
+    sources = [scanned[input_file] for input_file in new_inputs if input_file in scanned]
+
+    if not any(len(source) for source in sources):
+        if skipped_files and not failed_files:
+            print("Nothing new to import")
+            return EXIT_OK
+        print("No records to import", file=sys.stderr)
+        return EXIT_USAGE if failed_files == 0 else EXIT_FAILED
+
+    def report_progress(processed: int, total: int) -> None:
+        print(f"Progress: {processed}/{total} records")
+
+    # Metrics are written when requested with --metrics or when config.json sets metrics_dir
+    metrics_path = args.metrics
+    metrics_dir = load_config().get('metrics_dir', DEFAULT_CONFIG['metrics_dir'])
+    if metrics_path == '':
+        metrics_path = default_metrics_path(metrics_dir or DEFAULT_METRICS_DIR)
+    elif metrics_path is None and metrics_dir:
+        metrics_path = default_metrics_path(metrics_dir)
+
+    stats = run_import(args.db, sources,
+                       progress_callback=report_progress if args.progress else None,
+                       write_engine=args.engine,
+                       import_mode=args.mode,
+                       pragmas=None if args.no_pragmas else
+                       load_config().get('import_pragmas', DEFAULT_CONFIG['import_pragmas']),
+                       atf_workers=args.atf_workers,
+                       defer_indexes=args.defer_indexes or
+                       load_config().get('defer_index_build', DEFAULT_CONFIG['defer_index_build']),
+                       resume=not args.restart,
+                       metrics_path=metrics_path,
+                       shards=args.shards,
+                       sign_index=args.sign_index or
+                       load_config().get('build_sign_index', DEFAULT_CONFIG['build_sign_index']))
+
+    print(f"Files: {len(sources)} read, {skipped_files} skipped, "
+          f"{failed_files} failed")
+    if stats.resumed_records:
+        print(f"Resumed: {stats.resumed_records} records committed by an interrupted run")
+    print(f"Records: {stats.processed_records} processed, {stats.failed_records} failed "
+          f"of {stats.total_records}")
+    print(f"Time: {stats.total_time:.2f}s ({stats.records_per_second:.1f} records/s)")
+    if stats.index_build_time is not None:
+        print(f"Index build: {stats.index_build_time:.2f}s")
+    if stats.sign_index_build_time is not None:
+        print(f"Sign index build: {stats.sign_index_build_time:.2f}s")
+    if stats.stages:
+        slowest = sorted(stats.stages.items(), key=lambda item: -item[1])
+        print(f"Stages: {', '.join(f'{name}={seconds:.2f}s' for name, seconds in slowest)}")
+        print(f"SQL statements: {stats.queries}")
+    if stats.metrics_path:
+        print(f"Metrics: {stats.metrics_path}")
+    if stats.pragmas:
+        print(f"Pragmas: {', '.join(f'{k}={v}' for k, v in stats.pragmas.items())}")
+
+    if stats.error:
+        print(f"Import failed: {stats.error}", file=sys.stderr)
+        return EXIT_FAILED
+    if failed_files or stats.failed_records:
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+def export(args: argparse.Namespace) -> int:
+    """Write the tables of the database to Parquet or Arrow files"""
+    try:
+        stats = export_database(args.db, args.output, data_format=args.format, tables=args.tables,
+                                artifacts=args.artifacts, chunk_rows=args.chunk_rows)
+    except (ImportError, FileNotFoundError, ValueError) as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except Exception as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    for path, rows in stats.files.items():
+        print(f"{rows:>10} rows  {path}")
+    print(f"Time: {stats.total_time:.2f}s ({stats.total_rows} rows)")
+    return EXIT_OK
+
+def search(args: argparse.Namespace) -> int:
+    """Print the artifacts whose transliteration or translation match a query"""
+    try:
+        hits = search_database(args.db, args.query, limit=args.limit, columns=args.columns, raw=args.match)
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        print(f"Search failed: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except Exception as e:
+        print(f"Search failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    for hit in hits:
+        snippet = ' '.join((hit.snippet or '').split())
+        print(f"{hit.artifact_id:>10}  {hit.score:10.4g}  {snippet}")
+    print(f"{len(hits)} artifacts")
+    return EXIT_OK
+
+def sign_index(args: argparse.Namespace) -> int:
+    """Build the sign n-gram index of an imported database"""
+    try:
+        stats = index_database(args.db)
+    except FileNotFoundError as e:
+        print(f"Sign index failed: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except Exception as e:
+        print(f"Sign index failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    print(f"Inscriptions: {stats.inscriptions} ({stats.lines} lines)")
+    print(f"N-grams: {stats.ngrams}, postings: {stats.postings} in {stats.blocks} blocks "
+          f"({stats.bytes / 1024 / 1024:.1f} MiB)")
+    print(f"Time: {stats.total_time:.2f}s")
+    return EXIT_OK
+
+def signs(args: argparse.Namespace) -> int:
+    """Print the inscriptions containing a sign sequence"""
+    try:
+        matches = search_signs(args.db, args.sequence, limit=args.limit)
+    except (FileNotFoundError, ValueError, RuntimeError) as e:
+        print(f"Sign search failed: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except Exception as e:
+        print(f"Sign search failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    for match in matches:
+        print(f"{match.artifact_id:>10}  inscription {match.inscription_id}  "
+              f"lines {', '.join(str(line) for line in match.lines)}")
+    print(f"{len(matches)} inscriptions")
+    if sign_index_stale(args.db):
+        print("The sign index is out of date, rebuild it with 'cli.py sign-index'", file=sys.stderr)
+    return EXIT_OK
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="CDLI JSON export processor (headless)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Import CDLI JSON exports into a SQLite database")
+    ingest_parser.add_argument("--db", required=True, help="Path to the SQLite database")
+    ingest_parser.add_argument("--engine", choices=WRITE_ENGINES,
+                               default=load_config().get('write_engine', DEFAULT_CONFIG['write_engine']),
+                               help="Write engine: ORM objects or Core bulk inserts")
+    ingest_parser.add_argument("--mode", choices=IMPORT_MODES,
+                               default=load_config().get('import_mode', DEFAULT_CONFIG['import_mode']),
+                               help="replace: rebuild the database, append: keep it and upsert the records "
+                                    "(always uses the bulk engine)")
+    ingest_parser.add_argument("--atf-workers", type=int,
+                               default=load_config().get('atf_workers', DEFAULT_CONFIG['atf_workers']),
+                               help="Processes cleaning ATF ahead of the writer (0 = one per core, 1 = inline)")
+    ingest_parser.add_argument("--scan-workers", type=int,
+                               default=load_config().get('scan_workers', DEFAULT_CONFIG['scan_workers']),
+                               help="Processes scanning the files before the import (0 = one per core, 1 = inline)")
+    ingest_parser.add_argument("--shards", type=int,
+                               default=load_config().get('import_shards', DEFAULT_CONFIG['import_shards']),
+                               help="Writer processes building separate shard databases merged at the end "
+                                    "(replace mode)")
+    ingest_parser.add_argument("--defer-indexes", action="store_true",
+                               help="Drop secondary indexes before loading and build them once at the end "
+                                    "(replace mode)")
+    ingest_parser.add_argument("--sign-index", action="store_true",
+                               help="Build the sign n-gram index once the records are loaded "
+                                    "(otherwise append imports flag an existing one as out of date)")
+    ingest_parser.add_argument("--no-pragmas", action="store_true",
+                               help="Keep SQLite's default settings instead of the import_pragmas profile")
+    ingest_parser.add_argument("--force", action="store_true",
+                               help="Import files again even if they were already imported (append mode)")
+    ingest_parser.add_argument("--restart", action="store_true",
+                               help="Start over instead of resuming an interrupted import of the same files")
+    ingest_parser.add_argument("--metrics", metavar="PATH", nargs="?", const='', default=None,
+                               help="Write per-stage and per-batch timings to a JSON file "
+                                    "(default: a timestamped file in metrics_dir, or metrics/). "
+                                    "Use --metrics=PATH, or --metrics after the files")
+    ingest_parser.add_argument("--progress", action="store_true", help="Print progress after each batch")
+    ingest_parser.add_argument("files", nargs="+", help="JSON files to import, plain, .gz, .zst or zip archives "
+                                                      "(glob patterns allowed)")
+    ingest_parser.set_defaults(func=ingest)
+
+    export_parser = subparsers.add_parser("export", help="Export the database to Parquet or Arrow IPC files "
+                                                         "(requires pyarrow)")
+    export_parser.add_argument("--db", required=True, help="Path to the SQLite database")
+    export_parser.add_argument("--output", required=True, help="Directory receiving one file per table")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default=FORMAT_PARQUET,
+                               help="parquet, or arrow for Arrow IPC files")
+    export_parser.add_argument("--tables", nargs="+", default=None,
+                               help="Tables to export (default: every corpus table)")
+    export_parser.add_argument("--artifacts", action="store_true",
+                               help="Also write an artifact-level table with period, provenience, "
+                                    "languages and genres joined in")
+    export_parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS,
+                               help="Rows read and written per chunk")
+    export_parser.set_defaults(func=export)
+
+    search_parser = subparsers.add_parser("search", help="Search transliterations and translations, "
+                                                         "printing matching artifact ids by relevance")
+    search_parser.add_argument("--db", required=True, help="Path to the SQLite database")
+    search_parser.add_argument("--limit", type=int, default=20, help="Maximum number of artifacts listed")
+    search_parser.add_argument("--columns", nargs="+", choices=FTS_COLUMNS, default=None,
+                               help="Search only these columns (default: both)")
+    search_parser.add_argument("--match", action="store_true",
+                               help="Treat the query as an FTS5 expression (AND, OR, NOT, prefix*) "
+                                    "instead of a phrase")
+    search_parser.add_argument("query", help="Words or signs to find, e.g. \"lugal-e\" or \"barley\"")
+    search_parser.set_defaults(func=search)
+
+    sign_index_parser = subparsers.add_parser("sign-index", help="Build the sign n-gram index used by 'signs'")
+    sign_index_parser.add_argument("--db", required=True, help="Path to the SQLite database")
+    sign_index_parser.set_defaults(func=sign_index)
+
+    signs_parser = subparsers.add_parser("signs", help="List the inscriptions containing a sign sequence "
+                                                       "within a line (requires the sign index)")
+    signs_parser.add_argument("--db", required=True, help="Path to the SQLite database")
+    signs_parser.add_argument("--limit", type=int, default=None, help="Maximum number of inscriptions listed")
+    signs_parser.add_argument("sequence", help="Transliterated signs, e.g. \"{d}en-lil2\" or \"lugal e\"")
+    signs_parser.set_defaults(func=signs)
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of the command-line interface"""
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Table, delete, insert, or_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from database.tables_config import Identification, Inscription
+from database.entity_config import EntityConfig, ENTITY_CONFIGS, SINGLE_ENTITY_CONFIGS
+from database.entity_cache import EntityCache
+from utils.text_cleaner import parse_atf
+from utils.logger import logger
+
+# Inscription columns refreshed when an inscription is imported again
+INSCRIPTION_UPDATE_COLUMNS = ['raw_atf', 'cleaned_transliteration', 'existing_translation']
+
+def _column_names(table: Table) -> List[str]:
+    return [column.name for column in table.columns]
+
+def _upsert(table: Table, update_columns: List[str]):
+    """INSERT ... ON CONFLICT DO UPDATE that only rewrites rows whose values changed"""
+    statement = sqlite_insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key.columns],
+        set_={column: statement.excluded[column] for column in update_columns},
+        where=or_(*[table.c[column].is_distinct_from(statement.excluded[column])
+                    for column in update_columns])
+    )
+
+class BulkWriter:
+    """
+    Collects a batch of records into row lists per table and writes each
+    table with a single executemany through SQLAlchemy Core.
+
+    Mirrors process_record: existing identifications and lookup entities are
+    kept, existing inscriptions get their ATF columns refreshed.
+
+    With upsert enabled (append imports), existing identifications and lookup
+    entities are updated when their values changed and the link rows of every
+    imported artifact are replaced. Inscription.personal_translation is never
+    overwritten.
+    """
+
+    def __init__(self, entity_cache: Optional[EntityCache] = None, upsert: bool = False):
+        self.entity_cache = entity_cache if entity_cache is not None else EntityCache()
+        self.upsert = upsert
+        self.identification_columns = _column_names(Identification.__table__)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the rows collected for the current batch"""
+        self.identifications: Dict[int, dict] = {}
+        self.inscriptions: Dict[Optional[int], dict] = {}
+        self.new_inscriptions: List[dict] = []  # Inscriptions without an id
+        self.entities: Dict[Table, Dict[int, dict]] = {}
+        self.relations: Dict[Table, List[dict]] = {}
+
+    def add_record(self, record: Dict, cleaned_atf: Optional[Tuple[Optional[str], Optional[str]]] = None) -> bool:
+        """
+        Collect the rows of a single record
+
+        Args:
+            record: Decoded CDLI record
+            cleaned_atf: Cleaned transliteration and translation computed
+                ahead of time, cleaned here when None
+
+        Returns:
+            bool: False if the record has no id and was skipped
+        """
+        if 'id' not in record:
+            return False
+
+        root_id = record['id']
+        # Upserts let the latest occurrence of an artifact win, like successive imports
+        if self.upsert or root_id not in self.identifications:
+            row = {column: record.get(column) for column in self.identification_columns}
+            row['root_id'] = root_id
+            self.identifications[root_id] = row
+
+        if record.get('inscription'):
+            self.add_inscription(record['inscription'], root_id, cleaned_atf)
+
+        for entity_type, config in ENTITY_CONFIGS.items():
+            if isinstance(record.get(entity_type, []), list):
+                for item in record[entity_type]:
+                    try:
+                        self.add_entity(item, root_id, config)
+                    except Exception as e:
+                        logger.error("Error processing %s: %s", entity_type, e)
+
+        for entity_type, config in SINGLE_ENTITY_CONFIGS.items():
+            if record.get(entity_type):
+                self.add_entity({entity_type: record[entity_type]}, root_id, config)
+
+        return True
+
+    def add_inscription(self, inscription_data: Dict, root_id: int,
+                        cleaned_atf: Optional[Tuple[Optional[str], Optional[str]]] = None) -> None:
+        """Collect an inscription row, the last occurrence of an id wins"""
+        if not isinstance(inscription_data, Mapping):
+            return
+
+        raw_atf = inscription_data.get('atf')
+        cleaned_transliteration, existing_translation = cleaned_atf or parse_atf(raw_atf)
+        row = {
+            'inscription_id': inscription_data.get('id'),
+            'artifact_id': root_id,
+            'raw_atf': raw_atf,
+            'cleaned_transliteration': cleaned_transliteration,
+            'existing_translation': existing_translation,
+            'personal_translation': None
+        }
+        if row['inscription_id'] is None:
+            self.new_inscriptions.append(row)
+        elif row['inscription_id'] in self.inscriptions:
+            # Same as updating an existing inscription: the artifact stays the same
+            self.inscriptions[row['inscription_id']].update(
+                {column: row[column] for column in INSCRIPTION_UPDATE_COLUMNS})
+        else:
+            self.inscriptions[row['inscription_id']] = row
+
+    def add_entity(self, data: Dict, root_id: int, config: EntityConfig) -> None:
+        """Collect a lookup entity row and the link row to the artifact"""
+        entity_data = data.get(config.data_key, {})
+        entity_id = entity_data.get('id')
+
+        if not entity_id:
+            return
+
+        key = (config.model_class, entity_id)
+        if self.upsert or key not in self.entity_cache:
+            table = config.model_class.__table__
+            row = {column: entity_data.get(column) for column in _column_names(table)}
+            values = tuple(row.values())
+            if key not in self.entity_cache or values != self.entity_cache.get_values(*key):
+                self.entities.setdefault(table, {})[entity_id] = row
+                self.entity_cache.add(config.model_class, entity_id, values)
+
+        relation_data = {
+            'artifact_id': root_id,
+            f'{config.data_key}_id': entity_id
+        }
+        if config.extra_fields:
+            relation_data.update({field: data.get(field) for field in config.extra_fields})
+        self.relations.setdefault(config.relation_class.__table__, []).append(relation_data)
+
+    def _insert_statement(self, table: Table):
+        """Keep existing rows, or update them when upserting"""
+        if self.upsert:
+            return _upsert(table, [column.name for column in table.columns if not column.primary_key])
+        return insert(table).prefix_with('OR IGNORE')
+
+    def write(self, connection: Connection) -> None:
+        """Write the collected batch, one statement per table, then reset"""
+        for table, rows in self.entities.items():
+            connection.execute(self._insert_statement(table), list(rows.values()))
+
+        if self.identifications:
+            connection.execute(self._insert_statement(Identification.__table__),
+                               list(self.identifications.values()))
+
+        if self.inscriptions:
+            connection.execute(_upsert(Inscription.__table__, INSCRIPTION_UPDATE_COLUMNS),
+                               list(self.inscriptions.values()))
+        if self.new_inscriptions:
+            connection.execute(insert(Inscription.__table__), self.new_inscriptions)
+
+        if self.upsert and self.identifications:
+            # Links carry no natural key: replace those of the re-imported artifacts
+            artifact_ids = list(self.identifications)
+            for config in list(ENTITY_CONFIGS.values()) + list(SINGLE_ENTITY_CONFIGS.values()):
+                table = config.relation_class.__table__
+                connection.execute(delete(table).where(table.c.artifact_id.in_(artifact_ids)))
+
+        for table, rows in self.relations.items():
+            connection.execute(insert(table), rows)
+
+        self.reset()
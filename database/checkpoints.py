@@ -0,0 +1,69 @@
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from sqlalchemy import delete, inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from database.engine import create_import_engine
+from database.tables_config import ImportCheckpoint
+from utils.logger import logger
+
+def upgrade_checkpoints(connection: Connection) -> None:
+    """Add the columns that journals written by earlier versions lack"""
+    table = ImportCheckpoint.__tablename__
+    if not inspect(connection).has_table(table):
+        return
+    existing = {column['name'] for column in inspect(connection).get_columns(table)}
+    for column in ImportCheckpoint.__table__.columns:
+        if column.name not in existing:
+            connection.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column.name} "
+                                       f"{column.type.compile(connection.dialect)}")
+
+def load_checkpoints(connection: Connection) -> Dict[str, ImportCheckpoint]:
+    """
+    Return the checkpoints left by an unfinished import, keyed by source
+
+    Returns:
+        dict: Empty when the database has no journal yet
+    """
+    if not inspect(connection).has_table(ImportCheckpoint.__tablename__):
+        return {}
+    rows = connection.execute(select(ImportCheckpoint.__table__)).all()
+    return {row.source: row for row in rows}
+
+def pending_checkpoints(database_path: str, sources: Iterable[str]) -> Dict[str, ImportCheckpoint]:
+    """Checkpoints an interrupted import left for some of the sources, read from a database file"""
+    if not database_path or not os.path.exists(database_path):
+        return {}
+    engine = create_import_engine(database_path)
+    try:
+        with engine.begin() as connection:
+            upgrade_checkpoints(connection)
+            checkpoints = load_checkpoints(connection)
+    finally:
+        engine.dispose()
+    return {source: checkpoints[source] for source in sources if source in checkpoints}
+
+def save_checkpoint(connection: Connection, source: str, record_index: int, record_count: int,
+                    failed_records: int, content_hash: Optional[str] = None) -> None:
+    """Record how far a source got, in the same transaction as its last batch"""
+    values = {
+        'source': source,
+        'record_index': record_index,
+        'record_count': record_count,
+        'content_hash': content_hash,
+        'failed_records': failed_records,
+        'updated_at': datetime.now().isoformat(),
+    }
+    statement = sqlite_insert(ImportCheckpoint.__table__).values(**values)
+    statement = statement.on_conflict_do_update(
+        index_elements=['source'],
+        set_={key: value for key, value in values.items() if key != 'source'}
+    )
+    connection.execute(statement)
+
+def clear_checkpoints(connection: Connection, sources: Iterable[str]) -> None:
+    """Forget the journal of sources whose import completed"""
+    sources = list(sources)
+    connection.execute(delete(ImportCheckpoint.__table__).where(ImportCheckpoint.source.in_(sources)))
+    logger.debug("Cleared checkpoints of %d sources", len(sources))
@@ -0,0 +1,77 @@
+import re
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from utils.logger import logger
+
+# Settings put back once an import is done: a single database file with full durability
+SAFE_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+}
+
+_PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+_PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+def apply_pragmas(dbapi_connection, pragmas: Dict[str, object]) -> Dict[str, object]:
+    """
+    Apply pragmas to a raw sqlite3 connection
+
+    Returns:
+        dict: Value reported by SQLite for each pragma after applying it
+    """
+    applied = {}
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            # Pragmas cannot be bound as parameters, so only accept plain names and values
+            if not _PRAGMA_NAME.match(name) or not _PRAGMA_VALUE.match(str(value)):
+                logger.warning("Ignoring invalid pragma: %s=%s", name, value)
+                continue
+            cursor.execute(f"PRAGMA {name}={value}")
+            row = cursor.execute(f"PRAGMA {name}").fetchone()
+            applied[name] = row[0] if row else value
+    finally:
+        cursor.close()
+    return applied
+
+def create_import_engine(database_path: str, pragmas: Optional[Dict[str, object]] = None) -> Engine:
+    """
+    Create the engine used by an import, applying the import pragmas to
+    every connection it opens
+
+    Args:
+        database_path: Path to the SQLite database
+        pragmas: Pragma names and values, e.g. {"journal_mode": "WAL"}
+    """
+    engine = create_engine(f'sqlite:///{database_path}', echo=False)
+    if pragmas:
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            apply_pragmas(dbapi_connection, pragmas)
+    return engine
+
+def read_pragmas(engine: Engine, names) -> Dict[str, object]:
+    """Return the current value of the given pragmas on an engine connection"""
+    values = {}
+    with engine.connect() as connection:
+        for name in names:
+            if _PRAGMA_NAME.match(name):
+                values[name] = connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+    return values
+
+def restore_safe_pragmas(engine: Engine) -> None:
+    """Close the import connections and put back the safe persistent settings"""
+    engine.dispose()
+    dbapi_connection = engine.raw_connection()
+    try:
+        apply_pragmas(dbapi_connection, SAFE_PRAGMAS)
+    finally:
+        dbapi_connection.close()
+    engine.dispose()
+
+def count_queries(engine: Engine, metrics) -> None:
+    """Count every statement executed on the engine in an ImportMetrics"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        metrics.count_query()
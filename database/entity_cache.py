@@ -0,0 +1,50 @@
+from typing import Dict, Optional, Tuple, Type, Union
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.declarative import DeclarativeMeta
+from sqlalchemy.orm import Session
+from database.entity_config import ENTITY_CONFIGS, SINGLE_ENTITY_CONFIGS
+from utils.logger import logger
+
+class EntityCache:
+    """
+    Lookup entities (publications, materials, periods...) known to exist in
+    the database or in the current transaction, keyed by (model_class, id).
+
+    One cache is shared by all batches of an import so that each lookup row
+    is checked once instead of once per reference.
+    """
+
+    def __init__(self):
+        # Column values are kept when known so that changed entities can be detected
+        self._known: Dict[Tuple[Type[DeclarativeMeta], object], Optional[tuple]] = {}
+
+    def __contains__(self, key: Tuple[Type[DeclarativeMeta], object]) -> bool:
+        return key in self._known
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    def add(self, model_class: Type[DeclarativeMeta], entity_id, values: Optional[tuple] = None) -> None:
+        self._known[(model_class, entity_id)] = values
+
+    def get_values(self, model_class: Type[DeclarativeMeta], entity_id) -> Optional[tuple]:
+        """Return the cached column values of an entity, in table column order"""
+        return self._known.get((model_class, entity_id))
+
+    def clear(self) -> None:
+        self._known.clear()
+
+    def warm(self, bind: Union[Session, Connection]) -> int:
+        """
+        Load the lookup entities already stored in the database
+
+        Returns:
+            int: Number of entities in the cache
+        """
+        for config in list(ENTITY_CONFIGS.values()) + list(SINGLE_ENTITY_CONFIGS.values()):
+            model_class = config.model_class
+            for row in bind.execute(select(model_class.__table__)):
+                self._known[(model_class, row.id)] = tuple(row)
+        logger.debug("Entity cache warmed with %d entities", len(self._known))
+        return len(self._known)
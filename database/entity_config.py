@@ -8,7 +8,9 @@ from database.tables_config import (
     Language, ArtifactLanguage, 
     Genre, ArtifactGenre,
     ExternalResource, ArtifactExternalResource,
-    Collection, ArtifactCollection
+    Collection, ArtifactCollection,
+    Period, ArtifactPeriod,
+    Provenience, ArtifactProvenience
 )
 
 @dataclass
@@ -52,4 +54,18 @@ ENTITY_CONFIGS: Dict[str, EntityConfig] = {
         relation_class=ArtifactCollection,
         data_key='collection'
     )
-}
\ No newline at end of file
+}
+
+# Entities stored as a single object on the record rather than a list
+SINGLE_ENTITY_CONFIGS: Dict[str, EntityConfig] = {
+    'period': EntityConfig(
+        model_class=Period,
+        relation_class=ArtifactPeriod,
+        data_key='period'
+    ),
+    'provenience': EntityConfig(
+        model_class=Provenience,
+        relation_class=ArtifactProvenience,
+        data_key='provenience'
+    )
+}
@@ -0,0 +1,169 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import Float, Integer, Table, func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+from database.tables_config import Base, Identification
+from database.entity_config import EntityConfig, ENTITY_CONFIGS, SINGLE_ENTITY_CONFIGS
+from database.engine import create_import_engine
+from utils.logger import logger
+
+FORMAT_PARQUET = 'parquet'
+FORMAT_ARROW = 'arrow'  # Arrow IPC file
+EXPORT_FORMATS = (FORMAT_PARQUET, FORMAT_ARROW)
+
+EXPORT_CHUNK_ROWS = 65536  # Rows fetched from SQLite and written per record batch
+# Bookkeeping of the importer, not corpus data
+EXCLUDED_TABLES = ('import_checkpoints', 'imported_files')
+ARTIFACTS_TABLE = 'artifacts'  # Name of the denormalised artifact-level export
+ARTIFACT_NAMES_SEPARATOR = '; '
+
+# Entities joined into the artifact-level table: (export column, entity config, entity column)
+ARTIFACT_ENTITY_COLUMNS = (
+    ('period', SINGLE_ENTITY_CONFIGS['period'], 'period'),
+    ('provenience', SINGLE_ENTITY_CONFIGS['provenience'], 'provenience'),
+    ('languages', ENTITY_CONFIGS['languages'], 'language'),
+    ('genres', ENTITY_CONFIGS['genres'], 'genre'),
+)
+
+@dataclass
+class ExportStats:
+    """Rows written to each exported file"""
+    files: Dict[str, int] = field(default_factory=dict)
+    total_time: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.files.values())
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.ipc
+    except ImportError:
+        raise ImportError("Exporting requires the pyarrow package (pip install pyarrow)")
+    return pyarrow
+
+def _arrow_type(pa, column_type):
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    return pa.string()
+
+def export_tables(include_excluded: bool = False) -> List[Table]:
+    """Tables exported by default, in dependency order"""
+    return [table for table in Base.metadata.sorted_tables
+            if include_excluded or table.name not in EXCLUDED_TABLES]
+
+def _names_by_artifact(config: EntityConfig, column: str, label: str):
+    """Subquery of the distinct entity names of each artifact, joined in one string"""
+    relation = config.relation_class.__table__
+    entity = config.model_class.__table__
+    pairs = (select(relation.c.artifact_id, entity.c[column].label('name'))
+             .join(entity, entity.c.id == relation.c[f'{config.data_key}_id'])
+             .distinct()
+             .subquery())
+    return (select(pairs.c.artifact_id,
+                   func.group_concat(pairs.c.name, ARTIFACT_NAMES_SEPARATOR).label(label))
+            .group_by(pairs.c.artifact_id)
+            .subquery())
+
+def artifact_query() -> Select:
+    """
+    One row per artifact: the identification columns with the names of its
+    period, provenience, languages and genres. Artifacts linked to several
+    entities of a kind get their names joined with ARTIFACT_NAMES_SEPARATOR.
+    """
+    identification = Identification.__table__
+    columns = list(identification.columns)
+    joined = identification
+    for label, config, column in ARTIFACT_ENTITY_COLUMNS:
+        names = _names_by_artifact(config, column, label)
+        joined = joined.outerjoin(names, names.c.artifact_id == identification.c.root_id)
+        columns.append(names.c[label])
+    return select(*columns).select_from(joined).order_by(identification.c.root_id)
+
+def _open_writer(pa, path: str, schema, data_format: str):
+    if data_format == FORMAT_PARQUET:
+        return pa.parquet.ParquetWriter(path, schema, compression='zstd')
+    return pa.ipc.new_file(path, schema)
+
+def export_query(connection: Connection, query: Select, path: str, data_format: str = FORMAT_PARQUET,
+                 chunk_rows: int = EXPORT_CHUNK_ROWS) -> int:
+    """
+    Stream the rows of a query into a columnar file, one record batch per
+    chunk, so that tables of any size are exported in bounded memory
+
+    Returns:
+        int: Number of rows written
+    """
+    pa = _import_pyarrow()
+    schema = pa.schema([pa.field(column.name, _arrow_type(pa, column.type)) for column in query.selected_columns])
+    result = connection.execution_options(yield_per=chunk_rows).execute(query)
+    rows_written = 0
+    writer = _open_writer(pa, path, schema, data_format)
+    try:
+        for rows in result.partitions(chunk_rows):
+            columns = list(zip(*rows))
+            arrays = [pa.array(values, type=schema_field.type) for values, schema_field in zip(columns, schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            rows_written += len(rows)
+    finally:
+        writer.close()
+    return rows_written
+
+def export_database(database_path: str, output_dir: str, data_format: str = FORMAT_PARQUET,
+                    tables: Optional[Sequence[str]] = None, artifacts: bool = False,
+                    chunk_rows: int = EXPORT_CHUNK_ROWS) -> ExportStats:
+    """
+    Export database tables to one Parquet or Arrow IPC file each
+
+    Args:
+        database_path: Path to the SQLite database
+        output_dir: Directory receiving <table>.parquet or <table>.arrow files
+        data_format: FORMAT_PARQUET or FORMAT_ARROW
+        tables: Names of the tables to export, every corpus table when None
+        artifacts: Also write the denormalised artifact-level table
+        chunk_rows: Rows per record batch
+
+    Returns:
+        ExportStats: Rows written to each file
+    """
+    if data_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {data_format}")
+    if not os.path.exists(database_path):
+        raise FileNotFoundError(f"Database not found: {database_path}")
+    _import_pyarrow()
+
+    by_name = {table.name: table for table in export_tables(include_excluded=True)}
+    if tables is None:
+        selected = export_tables()
+    else:
+        unknown = [name for name in tables if name not in by_name]
+        if unknown:
+            raise ValueError(f"Unknown tables: {', '.join(unknown)}")
+        selected = [by_name[name] for name in tables]
+
+    queries = [(table.name, select(table)) for table in selected]
+    if artifacts:
+        queries.append((ARTIFACTS_TABLE, artifact_query()))
+
+    os.makedirs(output_dir, exist_ok=True)
+    start_time = time.time()
+    stats = ExportStats()
+    engine = create_import_engine(database_path)
+    try:
+        with engine.connect() as connection:
+            for name, query in queries:
+                path = os.path.join(output_dir, f"{name}.{data_format}")
+                table_start = time.time()
+                stats.files[path] = export_query(connection, query, path, data_format, chunk_rows)
+                logger.info("Exported %d rows to %s in %.2fs", stats.files[path], path, time.time() - table_start)
+    finally:
+        engine.dispose()
+    stats.total_time = time.time() - start_time
+    return stats
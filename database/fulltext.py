@@ -0,0 +1,174 @@
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from database.engine import create_import_engine
+from utils.text_cleaner import replace_characters
+from utils.logger import logger
+
+FTS_TABLE = 'inscription_fts'
+FTS_COLUMNS = ('cleaned_transliteration', 'existing_translation')
+# Diacritics are kept: š, ṣ, ṭ and ḫ are distinct signs from s, t and h.
+# Hyphens and braces split words into signs, so sign sequences are matched as phrases.
+FTS_TOKENIZER = 'unicode61 remove_diacritics 0'
+SNIPPET_TOKENS = 12
+
+_TRIGGERS = {
+    f'{FTS_TABLE}_insert': """
+        CREATE TRIGGER {name} AFTER INSERT ON inscription BEGIN
+            INSERT INTO {fts} (rowid, {columns}) VALUES (new.inscription_id, {new});
+        END""",
+    f'{FTS_TABLE}_delete': """
+        CREATE TRIGGER {name} AFTER DELETE ON inscription BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', old.inscription_id, {old});
+        END""",
+    f'{FTS_TABLE}_update': """
+        CREATE TRIGGER {name} AFTER UPDATE OF {columns} ON inscription BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', old.inscription_id, {old});
+            INSERT INTO {fts} (rowid, {columns}) VALUES (new.inscription_id, {new});
+        END""",
+}
+
+class SearchHit(NamedTuple):
+    """An artifact matching a search, through its best matching inscription"""
+    artifact_id: int
+    inscription_id: int
+    score: float  # bm25 relevance, lower is better
+    snippet: Optional[str]
+
+def _existing(connection: Connection, kind: str) -> set:
+    return {name for (name,) in connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = ?", (kind,))}
+
+def has_fulltext(connection: Connection) -> bool:
+    return FTS_TABLE in _existing(connection, 'table')
+
+def _create_table(connection: Connection) -> None:
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({', '.join(FTS_COLUMNS)}, "
+        f"content='inscription', content_rowid='inscription_id', tokenize='{FTS_TOKENIZER}')")
+
+def _create_triggers(connection: Connection) -> None:
+    existing = _existing(connection, 'trigger')
+    for name, template in _TRIGGERS.items():
+        if name not in existing:
+            connection.exec_driver_sql(template.format(
+                name=name, fts=FTS_TABLE, columns=', '.join(FTS_COLUMNS),
+                new=', '.join(f'new.{column}' for column in FTS_COLUMNS),
+                old=', '.join(f'old.{column}' for column in FTS_COLUMNS)))
+
+def drop_fulltext(connection: Connection) -> None:
+    """
+    Drop the full-text index and its triggers before a replace import, the
+    index is filled in one pass by build_fulltext once the records are loaded
+    """
+    for name in _TRIGGERS:
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+def build_fulltext(connection: Connection) -> None:
+    """
+    Index every inscription at once, then keep the index in sync with
+    triggers on the inscription table
+    """
+    if not has_fulltext(connection):
+        _create_table(connection)
+    connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    _create_triggers(connection)
+
+def ensure_fulltext(connection: Connection) -> bool:
+    """
+    Make sure the full-text index exists and is maintained row by row, as in
+    append imports. A database imported before the index existed is indexed
+    in full.
+
+    Returns:
+        bool: True if the index had to be built
+    """
+    if has_fulltext(connection):
+        _create_triggers(connection)
+        return False
+    logger.info("Building the full-text index of the existing inscriptions")
+    build_fulltext(connection)
+    return True
+
+def phrase_query(text: str) -> str:
+    """FTS5 query matching the words of a text in sequence, e.g. the signs of ša-ru-um"""
+    return '"' + text.replace('"', '""') + '"'
+
+def _phrase_match(query: str, columns: Iterable[str]) -> str:
+    """
+    Phrase query over the columns. Transliterations are stored with their
+    characters replaced (sz as š, h as ḫ...), so they are searched with the
+    query replaced the same way, e.g. sza-ru-um finds ša-ru-um. Translations
+    are searched with the query as typed.
+    """
+    columns_by_phrase: Dict[str, List[str]] = {}
+    for column in columns:
+        text = replace_characters(query) if column == 'cleaned_transliteration' else query
+        columns_by_phrase.setdefault(phrase_query(text), []).append(column)
+    return " OR ".join(f"{{{' '.join(phrase_columns)}}} : ({phrase})"
+                       for phrase, phrase_columns in columns_by_phrase.items())
+
+def search_inscriptions(connection: Connection, query: str, limit: int = 20,
+                        columns: Optional[Iterable[str]] = None, raw: bool = False) -> List[SearchHit]:
+    """
+    Search the transliterations and translations, returning the matching
+    artifacts ranked by relevance
+
+    Args:
+        connection: Connection to an imported database
+        query: Text searched as a phrase, in ATF (sz, h...) or with its
+            characters replaced (š, ḫ...), or an FTS5 query when raw is True
+            (e.g. 'barley AND silver', 'lugal*')
+        limit: Maximum number of artifacts returned
+        columns: Restrict the search to some of FTS_COLUMNS
+        raw: Pass the query to FTS5 as it is
+
+    Returns:
+        List[SearchHit]: One hit per artifact, best first
+    """
+    if columns:
+        unknown = [column for column in columns if column not in FTS_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown search columns: {', '.join(unknown)}")
+    match = query if raw else _phrase_match(query, columns or FTS_COLUMNS)
+    if raw and columns:
+        match = f"{{{' '.join(columns)}}} : ({match})"
+    if not has_fulltext(connection):
+        raise RuntimeError("The database has no full-text index, import it again to build it")
+
+    # Bare columns of a min() aggregate come from the row holding the minimum,
+    # so each artifact is returned with its best matching inscription
+    try:
+        rows = connection.exec_driver_sql(
+            f"SELECT inscription.artifact_id, inscription.inscription_id, min({FTS_TABLE}.rank) AS score "
+            f"FROM {FTS_TABLE} JOIN inscription ON inscription.inscription_id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH ? GROUP BY inscription.artifact_id ORDER BY score LIMIT ?",
+            (match, limit)).fetchall()
+    except OperationalError as e:
+        # Malformed raw queries, e.g. unbalanced quotes or a dangling AND
+        raise ValueError(f"Invalid search query {match!r}: {e.orig}") from e
+    if not rows:
+        return []
+
+    # Snippets cannot be computed in an aggregate query
+    placeholders = ', '.join('?' for _ in rows)
+    snippets = dict(connection.exec_driver_sql(
+        f"SELECT rowid, snippet({FTS_TABLE}, -1, '[', ']', '...', {SNIPPET_TOKENS}) FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH ? AND rowid IN ({placeholders})",
+        (match, *[row.inscription_id for row in rows])).fetchall())
+    return [SearchHit(row.artifact_id, row.inscription_id, row.score, snippets.get(row.inscription_id))
+            for row in rows]
+
+def search_database(database_path: str, query: str, limit: int = 20,
+                    columns: Optional[Iterable[str]] = None, raw: bool = False) -> List[SearchHit]:
+    """search_inscriptions on a database file"""
+    if not os.path.exists(database_path):
+        raise FileNotFoundError(f"Database not found: {database_path}")
+    engine = create_import_engine(database_path)
+    try:
+        with engine.connect() as connection:
+            return search_inscriptions(connection, query, limit, columns, raw)
+    finally:
+        engine.dispose()
@@ -0,0 +1,98 @@
+import os
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from database.engine import create_import_engine
+from database.tables_config import ImportedFile
+from utils.fingerprint import FileFingerprint, fingerprint_member
+from utils.logger import logger
+
+class ImportedFiles:
+    """
+    Fingerprints of the files already imported into a database. A file is
+    known when its path, size and modification time are unchanged, or
+    otherwise when a file with the same size and content hash was imported
+    (e.g. a copy or a renamed file).
+    """
+
+    def __init__(self, rows: Iterable = ()):
+        self.by_path = {}
+        self.by_content = set()
+        for row in rows:
+            self.by_path[row.path] = row
+            self.by_content.add((row.size, row.content_hash))
+
+    @classmethod
+    def load(cls, database_path: str) -> 'ImportedFiles':
+        """Read the fingerprints of a database, none when it does not exist yet"""
+        if not database_path or not os.path.exists(database_path):
+            return cls()
+        engine = create_import_engine(database_path)
+        try:
+            with engine.connect() as connection:
+                if not inspect(connection).has_table(ImportedFile.__tablename__):
+                    return cls()
+                return cls(connection.execute(select(ImportedFile.__table__)).all())
+        finally:
+            engine.dispose()
+
+    def __len__(self) -> int:
+        return len(self.by_path)
+
+    def _unchanged(self, path: str, size: int, mtime: float) -> bool:
+        row = self.by_path.get(path)
+        return row is not None and row.size == size and row.mtime == mtime
+
+    def is_unchanged(self, file_path: str, member: Optional[str] = None) -> bool:
+        """
+        Check a file from its path, size and modification time only, without
+        reading its content
+        """
+        if not self.by_path:
+            return False
+        if member is not None:
+            # Reads the entry from the archive's central directory
+            fingerprint = fingerprint_member(file_path, member)
+            return self._unchanged(fingerprint.path, fingerprint.size, fingerprint.mtime)
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        return self._unchanged(path, stat.st_size, stat.st_mtime)
+
+    def contains(self, fingerprint: Optional[FileFingerprint]) -> bool:
+        """
+        Check a fingerprint already computed, e.g. by the file scanner, by
+        metadata or by content
+        """
+        if fingerprint is None or not self.by_path:
+            return False
+        return (self._unchanged(fingerprint.path, fingerprint.size, fingerprint.mtime)
+                or (fingerprint.size, fingerprint.content_hash) in self.by_content)
+
+def record_imported_files(connection: Connection, fingerprints: Iterable[Tuple[FileFingerprint, int]]) -> None:
+    """
+    Record the fingerprints of fully imported files
+
+    Args:
+        connection: Connection of the import transaction
+        fingerprints: (fingerprint, record count) of each file
+    """
+    imported_at = datetime.now().isoformat()
+    rows = [{
+        'path': fingerprint.path,
+        'size': fingerprint.size,
+        'mtime': fingerprint.mtime,
+        'content_hash': fingerprint.content_hash,
+        'record_count': record_count,
+        'imported_at': imported_at,
+    } for fingerprint, record_count in fingerprints]
+    if not rows:
+        return
+    statement = sqlite_insert(ImportedFile.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=['path'],
+        set_={key: statement.excluded[key] for key in rows[0] if key != 'path'}
+    )
+    connection.execute(statement, rows)
+    logger.debug("Recorded fingerprints of %d files", len(rows))
@@ -0,0 +1,48 @@
+from typing import List
+from sqlalchemy import Index
+from sqlalchemy.engine import Connection
+from database.tables_config import Base
+from utils.logger import logger
+
+def secondary_indexes() -> List[Index]:
+    """Indexes declared on the models, primary keys excluded"""
+    return [index for table in Base.metadata.sorted_tables for index in table.indexes]
+
+def _existing_index_names(connection: Connection) -> set:
+    return {name for (name,) in connection.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+def create_missing_indexes(connection: Connection) -> int:
+    """
+    Create the indexes declared on the models that an existing database
+    lacks (create_all only adds indexes along with new tables)
+
+    Returns:
+        int: Number of indexes created
+    """
+    existing = _existing_index_names(connection)
+    created = 0
+    for index in secondary_indexes():
+        if index.name not in existing:
+            index.create(connection)
+            created += 1
+    if created:
+        logger.info("Created %d missing indexes", created)
+    return created
+
+def drop_secondary_indexes(connection: Connection) -> int:
+    """
+    Drop the secondary indexes before a bulk load, building them once at the
+    end is much cheaper than maintaining them row by row
+
+    Returns:
+        int: Number of indexes dropped
+    """
+    existing = _existing_index_names(connection)
+    dropped = 0
+    for index in secondary_indexes():
+        if index.name in existing:
+            index.drop(connection)
+            dropped += 1
+    logger.info("Dropped %d secondary indexes for the bulk load", dropped)
+    return dropped
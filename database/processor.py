@@ -1,7 +1,9 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
+import logging
 import time
-from sqlalchemy import create_engine
+from collections import deque
+from collections.abc import Mapping
+from itertools import islice
+from dataclasses import dataclass, field
 from sqlalchemy.orm import sessionmaker, Session
 from datetime import datetime
 from database.tables_config import Base, Identification, Inscription, Publication, ArtifactPublication
@@ -10,98 +12,435 @@ from database.tables_config import Genre, ArtifactGenre, ExternalResource, Artif
 from database.tables_config import Collection, ArtifactCollection
 from database.tables_config import Period, ArtifactPeriod
 from database.tables_config import Provenience, ArtifactProvenience
-from utils.text_cleaner import extract_cleaned_transliteration, extract_existing_translation
+from database.tables_config import ImportCheckpoint
+from utils.text_cleaner import parse_atf
+from utils.atf_pool import AtfCleaningPool
+from utils.metrics import ImportMetrics
 from utils.logger import logger
-from ui.progress_tracker import ProgressTracker
-from typing import Dict, Type, Optional, List, Callable
-from database.entity_config import EntityConfig, ENTITY_CONFIGS
+from typing import Deque, Dict, Iterator, Type, Optional, List, Callable, Tuple
+from database.entity_config import EntityConfig, ENTITY_CONFIGS, SINGLE_ENTITY_CONFIGS
+from database.bulk_writer import BulkWriter
+from database.entity_cache import EntityCache
+from database.indexes import create_missing_indexes, drop_secondary_indexes
+from database.engine import create_import_engine, read_pragmas, restore_safe_pragmas, count_queries
+from database.checkpoints import load_checkpoints, save_checkpoint, clear_checkpoints, upgrade_checkpoints
+from database.imported_files import record_imported_files
+from database.fulltext import drop_fulltext, build_fulltext, ensure_fulltext
+from database.sign_index import drop_sign_index, build_sign_index, mark_sign_index_stale
+from utils.record_source import RecordSource
 
 BATCH_SIZE = 100
-def send_to_database(frame: tk.Frame, database_path: str, cleaned_data: list):
-    if not database_path or not cleaned_data:
-        return
+
+# Write engines: ORM objects per record, or Core executemany per table and batch
+WRITE_ENGINE_ORM = 'orm'
+WRITE_ENGINE_BULK = 'bulk'
+WRITE_ENGINES = (WRITE_ENGINE_ORM, WRITE_ENGINE_BULK)
+
+# Import modes: rebuild the database, or keep it and upsert the new export
+IMPORT_MODE_REPLACE = 'replace'
+IMPORT_MODE_APPEND = 'append'
+IMPORT_MODES = (IMPORT_MODE_REPLACE, IMPORT_MODE_APPEND)
+
+@dataclass
+class ImportStats:
+    """Outcome of a database import run"""
+    total_records: int = 0
+    processed_records: int = 0
+    failed_records: int = 0
+    resumed_records: int = 0
+    total_time: float = 0.0
+    error: Optional[str] = None
+    pragmas: Dict[str, object] = field(default_factory=dict)
+    index_build_time: Optional[float] = None
+    fulltext_build_time: Optional[float] = None
+    sign_index_build_time: Optional[float] = None
+    stages: Dict[str, float] = field(default_factory=dict)  # Seconds spent in each stage
+    queries: int = 0  # SQL statements executed
+    metrics_path: Optional[str] = None
+
+    @property
+    def records_per_second(self) -> float:
+        return self.processed_records / self.total_time if self.total_time else 0.0
+
+def _source_batches(sources: List[RecordSource], positions: Dict[str, int],
+                    batch_sources: Deque[Tuple[RecordSource, int]]) -> Iterator[List[dict]]:
+    """
+    Yield the batches of every source, starting each one after its committed
+    records. The source and start index of each batch are queued on
+    batch_sources in the same order.
+    """
+    for source in sources:
+        index = positions.get(source.name, 0)
+        records = islice(iter(source), index, None)
+        while True:
+            batch = list(islice(records, BATCH_SIZE))
+            if not batch:
+                break
+            batch_sources.append((source, index))
+            index += len(batch)
+            yield batch
+
+def _content_hash(source: RecordSource) -> Optional[str]:
+    return source.fingerprint.content_hash if source.fingerprint is not None else None
+
+def _resume_checkpoints(engine, sources: List[RecordSource], import_mode: str, resume: bool,
+                        stats: ImportStats) -> Optional[Dict[str, ImportCheckpoint]]:
+    """
+    Read the journal of an interrupted import of the same sources
+
+    Returns:
+        dict: Checkpoint of each source already started, None to start from scratch
+    """
+    with engine.begin() as connection:
+        upgrade_checkpoints(connection)
+        checkpoints = load_checkpoints(connection)
+    pending = {source.name: checkpoints[source.name] for source in sources if source.name in checkpoints}
+    if not pending:
+        return None
+    if not resume:
+        logger.info("Ignoring the checkpoints of an interrupted import")
+        return None
+    for source in sources:
+        checkpoint = pending.get(source.name)
+        if checkpoint is None:
+            continue
+        # The file changed since, the committed records no longer line up. A
+        # re-export may keep the same number of records, so its content is compared.
+        if checkpoint.record_count != len(source) or checkpoint.content_hash != _content_hash(source):
+            logger.warning("%s changed since the import was interrupted: starting over", source.name)
+            return None
+
+    stats.resumed_records = sum(checkpoint.record_index for checkpoint in pending.values())
+    stats.failed_records = sum(checkpoint.failed_records for checkpoint in pending.values())
+    logger.info("Resuming interrupted %s import: %d records already committed", import_mode, stats.resumed_records)
+    return pending
+
+def run_import(database_path: str, sources: List[RecordSource],
+               progress_callback: Optional[Callable[[int, int], None]] = None,
+               write_engine: str = WRITE_ENGINE_ORM,
+               import_mode: str = IMPORT_MODE_REPLACE,
+               pragmas: Optional[Dict[str, object]] = None,
+               atf_workers: int = 1,
+               defer_indexes: bool = False,
+               resume: bool = True,
+               metrics_path: Optional[str] = None,
+               shards: int = 1,
+               sign_index: bool = False) -> ImportStats:
+    """
+    Write records to the database without any user interface.
+
+    Every batch is committed along with a checkpoint of its source, so an
+    interrupted import continues after its last committed batch when it is
+    run again on the same sources. The checkpoints are removed once all the
+    sources are imported, and the fingerprints of their files are recorded.
+
+    Args:
+        database_path: Path to the SQLite database
+        sources: Record sources to import, in order
+        progress_callback: Called with (processed, total) after each batch
+        write_engine: WRITE_ENGINE_ORM or WRITE_ENGINE_BULK
+        import_mode: IMPORT_MODE_REPLACE drops existing tables first,
+            IMPORT_MODE_APPEND keeps them and upserts the records
+        pragmas: SQLite pragmas applied to the import connections, safe
+            settings are restored afterwards
+        atf_workers: Processes cleaning the ATF of upcoming batches,
+            1 cleans inline and 0 uses every core
+        defer_indexes: Drop the secondary indexes before loading and build
+            them once at the end (replace mode only)
+        resume: Continue an interrupted import of the same sources instead
+            of starting over
+        metrics_path: JSON file receiving the time spent in each stage,
+            overall and per batch, and the query counts
+        shards: Writer processes of a replace import, see
+            database.sharding.run_sharded_import
+        sign_index: Build the sign n-gram index once the records are
+            loaded. Otherwise an append import flags an existing index as
+            out of date.
+
+    Returns:
+        ImportStats: Counters and timing of the run
+    """
+    if write_engine not in WRITE_ENGINES:
+        raise ValueError(f"Unknown write engine: {write_engine}")
+    if import_mode not in IMPORT_MODES:
+        raise ValueError(f"Unknown import mode: {import_mode}")
+    if import_mode == IMPORT_MODE_APPEND and write_engine == WRITE_ENGINE_ORM:
+        # Upserts are INSERT ... ON CONFLICT statements, only the bulk engine issues them
+        logger.info("Append mode writes through the bulk engine")
+        write_engine = WRITE_ENGINE_BULK
+    if shards > 1:
+        if import_mode == IMPORT_MODE_REPLACE:
+            from database.sharding import run_sharded_import
+            return run_sharded_import(database_path, sources, shards, progress_callback=progress_callback,
+                                      pragmas=pragmas, metrics_path=metrics_path, sign_index=sign_index)
+        # Merging shards into existing data would need upserts at every step
+        logger.info("Sharded writes only apply to replace imports")
+    if import_mode == IMPORT_MODE_APPEND and defer_indexes:
+        # Rebuilding would cost as much as the whole database, not the new export
+        logger.info("Indexes are maintained row by row in append mode")
+        defer_indexes = False
+    # A replace import fills the full-text index in one pass at the end,
+    # an append import keeps it in sync through its triggers
+    defer_fulltext = import_mode == IMPORT_MODE_REPLACE
 
     start_time = time.time()
-    total_records = len(cleaned_data)
-    processed_records = 0
-    failed_records = 0
-    
-    logger.info(f"Starting database operation at {datetime.now().isoformat()}")
-    logger.info(f"Total records to process: {total_records}")
-    logger.info(f"Batch size: {BATCH_SIZE}")
+    total_records = sum(len(source) for source in sources)
+    stats = ImportStats(total_records=total_records)
+    metrics = ImportMetrics()
     
-    engine = create_engine(f'sqlite:///{database_path}', echo=False)
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    
-    progress_tracker = ProgressTracker(frame, total_records)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Starting database operation at %s", datetime.now().isoformat())
+        logger.info("Total records to process: %d from %d sources", total_records, len(sources))
+        logger.info("Batch size: %d", BATCH_SIZE)
+        logger.info("Write engine: %s", write_engine)
+        logger.info("Import mode: %s", import_mode)
     
+    engine = None
+    atf_pool = None
     try:
+        with metrics.stage('setup'):
+            engine = create_import_engine(database_path, pragmas)
+            count_queries(engine, metrics)
+            if pragmas:
+                stats.pragmas = read_pragmas(engine, pragmas)
+                logger.info("Import pragmas: %s", stats.pragmas)
+            checkpoints = _resume_checkpoints(engine, sources, import_mode, resume, stats)
+            if import_mode == IMPORT_MODE_REPLACE and checkpoints is None:
+                Base.metadata.drop_all(engine)
+            Base.metadata.create_all(engine)
+            if import_mode == IMPORT_MODE_APPEND:
+                with engine.begin() as connection:
+                    create_missing_indexes(connection)
+                    ensure_fulltext(connection)
+                    # Rebuilding costs as much as the whole database, not the new export
+                    if not sign_index and mark_sign_index_stale(connection):
+                        logger.info("Sign index flagged out of date, rebuild it with 'cli.py sign-index'")
+            else:
+                with engine.begin() as connection:
+                    drop_fulltext(connection)
+                    drop_sign_index(connection)
+            if checkpoints is None:
+                checkpoints = {}
+                with engine.begin() as connection:
+                    clear_checkpoints(connection, [source.name for source in sources])
+            if defer_indexes:
+                with engine.begin() as connection:
+                    drop_secondary_indexes(connection)
+        Session = sessionmaker(bind=engine)
+
         with Session() as session:
+            entity_cache = EntityCache()
+            with metrics.stage('cache_warm'):
+                entity_cache.warm(session)
+            bulk_writer = None
+            if write_engine == WRITE_ENGINE_BULK:
+                bulk_writer = BulkWriter(entity_cache, upsert=import_mode == IMPORT_MODE_APPEND)
+            atf_pool = AtfCleaningPool(atf_workers)
+            batch_sources: Deque[Tuple[RecordSource, int]] = deque()
+            positions = {name: checkpoint.record_index for name, checkpoint in checkpoints.items()}
+            failed_by_source = {name: checkpoint.failed_records for name, checkpoint in checkpoints.items()}
+            # Decoding runs inside the cleaning pool's iteration, its time is only counted as parse
+            batches = metrics.timed(_source_batches(sources, positions, batch_sources), 'parse')
+            cleaned_batches = metrics.timed(atf_pool.clean_batches(batches), 'clean_atf')
+            done_records = stats.resumed_records
             batch_start_time = time.time()
+            # Checked once, the per-batch lines cost nothing when logging is off
+            log_batches = logger.isEnabledFor(logging.INFO)
             
-            for idx in range(0, total_records, BATCH_SIZE):
-                batch = cleaned_data[idx:idx + BATCH_SIZE]
+            # Each batch is measured from the moment its records are read
+            metrics.start_batch(1)
+            for batch_number, (batch, cleaned_atfs) in enumerate(cleaned_batches, start=1):
+                source, idx = batch_sources.popleft()
                 batch_size = len(batch)
+                failed = False
                 
                 try:
-                    for record in batch:
-                        process_record(session, record)
-                        processed_records += 1
-                    
-                    session.flush()
-                    batch_time = time.time() - batch_start_time
-                    logger.info(f"Batch {idx//BATCH_SIZE + 1} processed: {batch_size} records in {batch_time:.2f}s")
-                    progress_tracker.update(min(idx + BATCH_SIZE, total_records), total_records)
-                    batch_start_time = time.time()
+                    if bulk_writer:
+                        with metrics.stage('build_rows'):
+                            for record, cleaned_atf in zip(batch, cleaned_atfs):
+                                bulk_writer.add_record(record, cleaned_atf)
+                        with metrics.stage('write'):
+                            bulk_writer.write(session.connection())
+                    else:
+                        with metrics.stage('process_records'):
+                            for record, cleaned_atf in zip(batch, cleaned_atfs):
+                                process_record(session, record, entity_cache, cleaned_atf)
+                        with metrics.stage('flush'):
+                            session.flush()
+                    with metrics.stage('checkpoint'):
+                        save_checkpoint(session.connection(), source.name, idx + batch_size, len(source),
+                                        failed_by_source.get(source.name, 0), _content_hash(source))
+                    with metrics.stage('commit'):
+                        session.commit()
+                    stats.processed_records += batch_size
+
+                    if log_batches:
+                        logger.info("Batch %d processed: %d records in %.2fs",
+                                    batch_number, batch_size, time.time() - batch_start_time)
                     
                 except Exception as e:
-                    failed_records += batch_size
-                    logger.error(f"Batch {idx//BATCH_SIZE + 1} failed: {str(e)}")
-                    logger.error(f"Failed records in batch: {batch_size}")
-                    session.rollback()
-                    continue
-            
-            session.commit()
-            total_time = time.time() - start_time
+                    failed = True
+                    stats.failed_records += batch_size
+                    logger.error("Batch %d failed: %s", batch_number, e)
+                    logger.error("Failed records in batch: %d (%s, from record %d)", batch_size, source.name, idx)
+                    with metrics.stage('rollback'):
+                        session.rollback()
+                        if bulk_writer:
+                            bulk_writer.reset()
+                        # The rollback discarded entities added by this batch
+                        entity_cache.clear()
+                        entity_cache.warm(session)
+                        # A resumed import skips the failed batch rather than failing on it again
+                        failed_by_source[source.name] = failed_by_source.get(source.name, 0) + batch_size
+                        save_checkpoint(session.connection(), source.name, idx + batch_size, len(source),
+                                        failed_by_source[source.name], _content_hash(source))
+                        session.commit()
+
+                metrics.end_batch(source.name, batch_size, failed)
+                done_records += batch_size
+                if progress_callback:
+                    progress_callback(done_records, total_records)
+                batch_start_time = time.time()
+                metrics.start_batch(batch_number + 1)
+            metrics.discard_batch()
             
-            logger.info("=== Database Operation Summary ===")
-            logger.info(f"Total time: {total_time:.2f}s")
-            logger.info(f"Records processed: {processed_records}")
-            logger.info(f"Records failed: {failed_records}")
-            logger.info(f"Average speed: {processed_records/total_time:.1f} records/s")
+            with metrics.stage('finalize'):
+                clear_checkpoints(session.connection(), [source.name for source in sources])
+                # Sources with failed records are not marked imported, so that append imports retry them
+                record_imported_files(session.connection(), [(source.fingerprint, len(source))
+                                                             for source in sources
+                                                             if source.fingerprint is not None
+                                                             and not failed_by_source.get(source.name)])
+                session.commit()
+            if defer_indexes:
+                with metrics.stage('index_build'):
+                    build_deferred_indexes(engine, stats)
+            if defer_fulltext:
+                with metrics.stage('fulltext_build'):
+                    build_fulltext_index(engine, stats)
+            if sign_index:
+                with metrics.stage('sign_index_build'):
+                    rebuild_sign_index(engine, stats)
+            stats.total_time = time.time() - start_time
+            stats.stages = metrics.stage_seconds()
+            stats.queries = metrics.queries
             
-            if failed_records == 0:
-                messagebox.showinfo("Success", f"Successfully processed {processed_records} records")
-            else:
-                messagebox.showwarning("Partial Success", 
-                    f"Processed {processed_records} records with {failed_records} failures")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("=== Database Operation Summary ===")
+                logger.info("Total time: %.2fs", stats.total_time)
+                if stats.resumed_records:
+                    logger.info("Records resumed: %d", stats.resumed_records)
+                logger.info("Records processed: %d", stats.processed_records)
+                logger.info("Records failed: %d", stats.failed_records)
+                logger.info("Average speed: %.1f records/s", stats.records_per_second)
+                logger.info("SQL statements: %d", stats.queries)
+                for line in metrics.summary_lines():
+                    logger.info("Stage %s", line)
+                if stats.pragmas:
+                    logger.info("Pragmas: %s", ', '.join(f'{k}={v}' for k, v in stats.pragmas.items()))
             
     except Exception as e:
+        stats.error = str(e)
+        stats.total_time = time.time() - start_time
         logger.error("=== Database Operation Failed ===")
-        logger.error(f"Error: {str(e)}")
-        logger.error(f"Stack trace:", exc_info=True)
-        logger.error(f"Processed {processed_records} of {total_records} records")
+        logger.error("Error: %s", e)
+        logger.error("Stack trace:", exc_info=True)
+        logger.error("Committed %d of %d records, run the import again to resume",
+                     stats.resumed_records + stats.processed_records, total_records)
+    finally:
+        if atf_pool is not None:
+            atf_pool.close()
+        if engine is not None and defer_indexes and stats.index_build_time is None:
+            # Never leave the database without its indexes after a failure
+            try:
+                with metrics.stage('index_build'):
+                    build_deferred_indexes(engine, stats)
+            except Exception as e:
+                logger.error("Failed to build indexes: %s", e)
+        if engine is not None and defer_fulltext and stats.fulltext_build_time is None:
+            try:
+                with metrics.stage('fulltext_build'):
+                    build_fulltext_index(engine, stats)
+            except Exception as e:
+                logger.error("Failed to build the full-text index: %s", e)
+        if engine is not None and pragmas:
+            try:
+                restore_safe_pragmas(engine)
+            except Exception as e:
+                logger.error("Failed to restore safe pragmas: %s", e)
+        stats.stages = metrics.stage_seconds()
+        stats.queries = metrics.queries
+        if metrics_path:
+            try:
+                metrics.write(metrics_path, **metrics_summary(database_path, write_engine, import_mode, stats))
+                stats.metrics_path = metrics_path
+            except Exception as e:
+                logger.error("Failed to write metrics: %s", e)
+
+    return stats
 
-def generic_process_entity(session: Session, data: Dict, identification: Identification, config: EntityConfig) -> None:
+def metrics_summary(database_path: str, write_engine: str, import_mode: str, stats: ImportStats) -> Dict:
+    """Run details written at the top of the metrics file"""
+    return {
+        'database': database_path,
+        'write_engine': write_engine,
+        'import_mode': import_mode,
+        'batch_size': BATCH_SIZE,
+        'total_records': stats.total_records,
+        'processed_records': stats.processed_records,
+        'failed_records': stats.failed_records,
+        'resumed_records': stats.resumed_records,
+        'total_time': round(stats.total_time, 6),
+        'records_per_second': round(stats.records_per_second, 1),
+        'index_build_time': stats.index_build_time,
+        'fulltext_build_time': stats.fulltext_build_time,
+        'sign_index_build_time': stats.sign_index_build_time,
+        'pragmas': stats.pragmas,
+        'error': stats.error,
+    }
+
+def build_deferred_indexes(engine, stats: ImportStats) -> None:
+    """Build the secondary indexes dropped before the load"""
+    index_start_time = time.time()
+    with engine.begin() as connection:
+        create_missing_indexes(connection)
+    stats.index_build_time = time.time() - index_start_time
+    logger.info("Index build time: %.2fs", stats.index_build_time)
+
+def build_fulltext_index(engine, stats: ImportStats) -> None:
+    """Index every imported transliteration and translation for search"""
+    fulltext_start_time = time.time()
+    with engine.begin() as connection:
+        build_fulltext(connection)
+    stats.fulltext_build_time = time.time() - fulltext_start_time
+    logger.info("Full-text index build time: %.2fs", stats.fulltext_build_time)
+
+def rebuild_sign_index(engine, stats: ImportStats) -> None:
+    """Build the sign n-gram index of the imported transliterations"""
+    with engine.begin() as connection:
+        stats.sign_index_build_time = build_sign_index(connection).total_time
+    logger.info("Sign index build time: %.2fs", stats.sign_index_build_time)
+
+def generic_process_entity(session: Session, data: Dict, identification: Identification, config: EntityConfig,
+                           entity_cache: Optional[EntityCache] = None) -> None:
     entity_data = data.get(config.data_key, {})
     entity_id = entity_data.get('id')
     
     if not entity_id:
         return
         
-    existing = session.query(config.model_class).filter_by(id=entity_id).first()
-    if existing is None:
-        entity = config.model_class(**{k: v for k, v in entity_data.items() 
-                                     if hasattr(config.model_class, k)})
-        session.add(entity)
-    else:
-        entity = existing
+    if entity_cache is None or (config.model_class, entity_id) not in entity_cache:
+        existing = session.query(config.model_class).filter_by(id=entity_id).first()
+        if existing is None:
+            entity = config.model_class(**{k: v for k, v in entity_data.items() 
+                                         if hasattr(config.model_class, k)})
+            session.add(entity)
+        if entity_cache is not None:
+            entity_cache.add(config.model_class, entity_id)
 
     relation_data = {
         'artifact_id': identification.root_id,
-        f'{config.data_key}_id': entity.id
+        f'{config.data_key}_id': entity_id
     }
     
     if config.extra_fields:
@@ -110,7 +449,9 @@ def generic_process_entity(session: Session, data: Dict, identification: Identif
     relation = config.relation_class(**relation_data)
     session.add(relation)
 
-def process_record(session: Session, record: Dict) -> Optional[Identification]:
+def process_record(session: Session, record: Dict,
+                   entity_cache: Optional[EntityCache] = None,
+                   cleaned_atf: Optional[Tuple[Optional[str], Optional[str]]] = None) -> Optional[Identification]:
     """Process a single record"""
     if 'id' not in record:
         return None
@@ -119,25 +460,22 @@ def process_record(session: Session, record: Dict) -> Optional[Identification]:
     
     # Process inscription separately
     if record.get('inscription'):
-        process_inscription(session, record['inscription'], identification)
+        process_inscription(session, record['inscription'], identification, cleaned_atf)
     
     # Process all other entities using generic processor
     for entity_type, config in ENTITY_CONFIGS.items():
         if isinstance(record.get(entity_type, []), list):
             for item in record[entity_type]:
                 try:
-                    generic_process_entity(session, item, identification, config)
+                    generic_process_entity(session, item, identification, config, entity_cache)
                 except Exception as e:
-                    logger.error(f"Error processing {entity_type}: {str(e)}")
+                    logger.error("Error processing %s: %s", entity_type, e)
     
     # Handle period and provenience separately since they're single objects
-    if record.get('period'):
-        generic_process_entity(session, {'period': record['period']}, identification,
-                             EntityConfig(Period, ArtifactPeriod, 'period'))
-    
-    if record.get('provenience'):
-        generic_process_entity(session, {'provenience': record['provenience']}, identification,
-                             EntityConfig(Provenience, ArtifactProvenience, 'provenience'))
+    for entity_type, config in SINGLE_ENTITY_CONFIGS.items():
+        if record.get(entity_type):
+            generic_process_entity(session, {entity_type: record[entity_type]}, identification, config,
+                                   entity_cache)
                     
     return identification
 
@@ -163,24 +501,25 @@ def process_identification(session, record, root_id):
         return identification
     return existing
 
-def process_inscription(session, inscription_data, identification):
-    """Process inscription data"""
-    if isinstance(inscription_data, dict):
+def process_inscription(session, inscription_data, identification, cleaned_atf=None):
+    """Process inscription data, cleaning the ATF unless it was cleaned ahead of time"""
+    if isinstance(inscription_data, Mapping):
         inscription_id = inscription_data.get('id')
         existing = session.query(Inscription).filter_by(inscription_id=inscription_id).first()
 
         raw_atf = inscription_data.get('atf')
+        cleaned_transliteration, existing_translation = cleaned_atf or parse_atf(raw_atf)
         if existing is None:
             inscription = Inscription(
                 inscription_id=inscription_id,
                 artifact_id=identification.root_id,
                 raw_atf=raw_atf,
-                cleaned_transliteration=extract_cleaned_transliteration(raw_atf),
-                existing_translation=extract_existing_translation(raw_atf),
+                cleaned_transliteration=cleaned_transliteration,
+                existing_translation=existing_translation,
                 personal_translation=None
             )
             session.add(inscription)
         else:
             existing.raw_atf = raw_atf
-            existing.cleaned_transliteration = extract_cleaned_transliteration(raw_atf)
-            existing.existing_translation = extract_existing_translation(raw_atf)
+            existing.cleaned_transliteration = cleaned_transliteration
+            existing.existing_translation = existing_translation
@@ -0,0 +1,116 @@
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from database.tables_config import Identification
+from database.entity_config import EntityConfig, ENTITY_CONFIGS, SINGLE_ENTITY_CONFIGS
+
+# Inscription keys read by process_inscription and BulkWriter.add_inscription
+INSCRIPTION_FIELDS = ('id', 'atf')
+
+class _Missing:
+    """Marks a key absent from the decoded record, unlike a null value"""
+    __slots__ = ()
+
+    def __reduce__(self):
+        return 'MISSING'
+
+    def __repr__(self) -> str:
+        return 'MISSING'
+
+MISSING = _Missing()
+
+class ProjectedRecord(Mapping):
+    """
+    Read-only record holding only the fields used by the importer, as a
+    tuple of values. The key index is shared by every record of the same
+    projection, so a record costs little more than its values.
+    """
+    __slots__ = ('_index', '_values')
+
+    def __init__(self, index: Dict[str, int], values: Tuple):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key: str):
+        position = self._index.get(key)
+        if position is None or self._values[position] is MISSING:
+            raise KeyError(key)
+        return self._values[position]
+
+    def get(self, key: str, default=None):
+        position = self._index.get(key)
+        if position is None:
+            return default
+        value = self._values[position]
+        return default if value is MISSING else value
+
+    def __contains__(self, key) -> bool:
+        position = self._index.get(key)
+        return position is not None and self._values[position] is not MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key, value in zip(self._index, self._values) if value is not MISSING)
+
+    def __len__(self) -> int:
+        return sum(1 for value in self._values if value is not MISSING)
+
+    def __reduce__(self):
+        # Records are pickled when batches are sent to other processes
+        return ProjectedRecord, (self._index, self._values)
+
+    def __repr__(self) -> str:
+        return f"ProjectedRecord({dict(self)!r})"
+
+class Projection:
+    """
+    Keys kept from a decoded object. Nested projections apply to objects
+    and to the objects of lists found under their key, other values are
+    kept as they are.
+    """
+
+    def __init__(self, fields: Dict[str, Optional['Projection']]):
+        self.index = {key: position for position, key in enumerate(fields)}
+        self.fields = tuple(fields.items())
+
+    def apply(self, data: dict) -> ProjectedRecord:
+        values = []
+        for key, nested in self.fields:
+            value = data.get(key, MISSING)
+            if nested is not None:
+                if isinstance(value, dict):
+                    value = nested.apply(value)
+                elif isinstance(value, list):
+                    value = [nested.apply(item) if isinstance(item, dict) else item for item in value]
+            values.append(value)
+        return ProjectedRecord(self.index, tuple(values))
+
+def _columns(model_class) -> Dict[str, None]:
+    return {column.name: None for column in model_class.__table__.columns}
+
+def _entity_projection(config: EntityConfig) -> Projection:
+    fields = {config.data_key: Projection(_columns(config.model_class))}
+    fields.update((field, None) for field in config.extra_fields or ())
+    return Projection(fields)
+
+def build_record_projection() -> Projection:
+    """
+    Projection of a CDLI record on the fields the importer reads, derived
+    from the Identification columns and the entity configurations
+    """
+    fields: Dict[str, Optional[Projection]] = {'id': None}
+    fields.update((name, None) for name in _columns(Identification) if name != 'root_id')
+    fields['inscription'] = Projection({field: None for field in INSCRIPTION_FIELDS})
+    for entity_type, config in ENTITY_CONFIGS.items():
+        fields[entity_type] = _entity_projection(config)
+    for entity_type, config in SINGLE_ENTITY_CONFIGS.items():
+        # Stored on the record as the entity itself, not wrapped like list items
+        fields[entity_type] = Projection(_columns(config.model_class))
+    return Projection(fields)
+
+RECORD_PROJECTION = build_record_projection()
+
+def project_record(record: dict) -> ProjectedRecord:
+    """Drop the keys of a decoded record that the importer never reads"""
+    return RECORD_PROJECTION.apply(record)
+
+def project_records(records: Iterable[dict]) -> Iterator[ProjectedRecord]:
+    return map(RECORD_PROJECTION.apply, records)
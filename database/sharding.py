@@ -0,0 +1,379 @@
+import multiprocessing
+import os
+import queue
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection
+from database.tables_config import Base, Identification, Inscription
+from database.entity_config import ENTITY_CONFIGS, SINGLE_ENTITY_CONFIGS
+from database.engine import create_import_engine, read_pragmas, restore_safe_pragmas, count_queries
+from database.bulk_writer import BulkWriter, INSCRIPTION_UPDATE_COLUMNS
+from database.entity_cache import EntityCache
+from database.indexes import drop_secondary_indexes
+from database.checkpoints import clear_checkpoints
+from database.imported_files import record_imported_files
+from database.processor import (ImportStats, BATCH_SIZE, WRITE_ENGINE_BULK, IMPORT_MODE_REPLACE,
+                                build_deferred_indexes, build_fulltext_index, rebuild_sign_index,
+                                metrics_summary)
+from database.fulltext import drop_fulltext
+from database.sign_index import drop_sign_index
+from utils.metrics import ImportMetrics
+from utils.record_source import RecordSource
+from utils.logger import logger
+
+# Shard databases only live until the merge, durability is traded for speed
+SHARD_PRAGMAS = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,
+}
+SHARD_QUEUE_BATCHES = 4  # Batches waiting for each shard writer, bounds the memory of a fast reader
+WORKER_CHECK_SECONDS = 1.0  # How long to wait on a queue before checking that the writers are alive
+
+# Messages sent by the shard writers: (kind, shard, value)
+MESSAGE_BATCH = 'batch'  # value: (processed, failed) records of a batch
+MESSAGE_DONE = 'done'    # value: None
+MESSAGE_ERROR = 'error'  # value: error message
+
+def shard_of(root_id, shards: int) -> int:
+    """Shard of an artifact: every occurrence of an artifact goes to the same shard"""
+    if isinstance(root_id, int):
+        return root_id % shards
+    return zlib.crc32(str(root_id).encode('utf-8')) % shards
+
+def shard_path(database_path: str, shard: int) -> str:
+    return f"{database_path}.shard{shard}"
+
+def _remove_files(paths: List[str]) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def _write_shard(shard: int, path: str, batches, results) -> None:
+    """
+    Shard writer process: write the batches it receives to its own database
+    with the bulk writer, until it receives None. Failed batches are rolled
+    back and counted, like in run_import.
+    """
+    try:
+        _remove_files([path])
+        engine = create_import_engine(path, SHARD_PRAGMAS)
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            drop_secondary_indexes(connection)
+        entity_cache = EntityCache()
+        writer = BulkWriter(entity_cache)
+        with engine.connect() as connection:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    break
+                try:
+                    for record in batch:
+                        writer.add_record(record)
+                    writer.write(connection)
+                    connection.commit()
+                    results.put((MESSAGE_BATCH, shard, (len(batch), 0)))
+                except Exception as e:
+                    logger.error("Shard %d batch failed: %s", shard, e)
+                    connection.rollback()
+                    writer.reset()
+                    # The rollback discarded entities added by this batch
+                    entity_cache.clear()
+                    entity_cache.warm(connection)
+                    connection.commit()
+                    results.put((MESSAGE_BATCH, shard, (0, len(batch))))
+        engine.dispose()
+        results.put((MESSAGE_DONE, shard, None))
+    except Exception as e:
+        logger.error("Shard %d writer failed: %s", shard, e, exc_info=True)
+        results.put((MESSAGE_ERROR, shard, str(e)))
+
+def _column_list(table: Table, skip_id: bool = False) -> str:
+    return ", ".join(column.name for column in table.columns if not (skip_id and column.name == 'id'))
+
+def merge_statements() -> List[str]:
+    """
+    INSERT ... SELECT statements copying an attached `shard` database into
+    the main one. Lookup entities and artifacts shared by several shards are
+    kept once, inscriptions imported again get their ATF refreshed, and link
+    rows get new ids since every shard numbered its own from 1.
+    """
+    configs = list(ENTITY_CONFIGS.values()) + list(SINGLE_ENTITY_CONFIGS.values())
+    statements = []
+    for table in [config.model_class.__table__ for config in configs] + [Identification.__table__]:
+        columns = _column_list(table)
+        statements.append(f"INSERT OR IGNORE INTO main.{table.name} ({columns}) "
+                          f"SELECT {columns} FROM shard.{table.name}")
+
+    table = Inscription.__table__
+    columns = _column_list(table)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in INSCRIPTION_UPDATE_COLUMNS)
+    # WHERE true separates the SELECT from the upsert clause, as SQLite requires
+    statements.append(f"INSERT INTO main.{table.name} ({columns}) SELECT {columns} FROM shard.{table.name} "
+                      f"WHERE true ON CONFLICT (inscription_id) DO UPDATE SET {updates}")
+
+    for table in [config.relation_class.__table__ for config in configs]:
+        columns = _column_list(table, skip_id=True)
+        statements.append(f"INSERT INTO main.{table.name} ({columns}) "
+                          f"SELECT {columns} FROM shard.{table.name} ORDER BY id")
+    return statements
+
+def merge_shards(connection: Connection, paths: List[str]) -> None:
+    """Copy the shard databases into the database of the connection, one transaction per shard"""
+    statements = merge_statements()
+    for path in paths:
+        # ATTACH is not allowed inside a transaction, the inserts start one
+        connection.exec_driver_sql("ATTACH DATABASE ? AS shard", (path,))
+        try:
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+            connection.commit()
+        finally:
+            connection.exec_driver_sql("DETACH DATABASE shard")
+        logger.info("Merged %s", path)
+
+def _iter_records(sources: List[RecordSource]) -> Iterator[Tuple[str, dict]]:
+    for source in sources:
+        for record in source:
+            yield source.name, record
+
+class _ShardWriters:
+    """The shard writer processes, their batch queues and the messages they send back"""
+
+    def __init__(self, database_path: str, shards: int):
+        context = multiprocessing.get_context('spawn')
+        self.paths = [shard_path(database_path, shard) for shard in range(shards)]
+        self.results = context.Queue()
+        self.queues = [context.Queue(maxsize=SHARD_QUEUE_BATCHES) for _ in range(shards)]
+        # Spawned writers import the database layer and re-import the entry module,
+        # which only loads the GUI when run as the main program
+        self.processes = [context.Process(target=_write_shard, name=f"shard-writer-{shard}", daemon=True,
+                                          args=(shard, self.paths[shard], self.queues[shard], self.results))
+                          for shard in range(shards)]
+        self.finished = set()
+        self.errors: List[str] = []
+
+    def start(self) -> None:
+        for process in self.processes:
+            process.start()
+
+    def _stopped(self) -> List[int]:
+        """Shards whose writer exited without saying it was done"""
+        return [shard for shard, process in enumerate(self.processes)
+                if shard not in self.finished and not process.is_alive()]
+
+    def send(self, shard: int, batch: Optional[List[dict]]) -> None:
+        """Queue a batch for a shard, waiting while the shard is busy. None ends the shard."""
+        while True:
+            try:
+                self.queues[shard].put(batch, timeout=WORKER_CHECK_SECONDS)
+                return
+            except queue.Full:
+                if shard in self._stopped():
+                    raise RuntimeError(f"Shard writer {shard} stopped unexpectedly")
+
+    def _get(self, block: bool):
+        """Next message, None when not blocking and there is none"""
+        while True:
+            try:
+                return self.results.get(block=block, timeout=WORKER_CHECK_SECONDS if block else None)
+            except queue.Empty:
+                if not block:
+                    return None
+            stopped = self._stopped()
+            if stopped:
+                try:
+                    # A writer that just exited may have sent its last message meanwhile
+                    return self.results.get(timeout=WORKER_CHECK_SECONDS)
+                except queue.Empty:
+                    raise RuntimeError(f"Shard writer {stopped[0]} stopped unexpectedly")
+
+    def receive(self, handle: Callable, block: bool = False) -> None:
+        """Handle the messages sent back so far, or wait for at least one when blocking"""
+        while True:
+            message = self._get(block)
+            if message is None:
+                return
+            kind, shard, value = message
+            if kind == MESSAGE_BATCH:
+                handle(shard, *value)
+            else:
+                self.finished.add(shard)
+                if kind == MESSAGE_ERROR:
+                    self.errors.append(f"shard {shard}: {value}")
+            block = False
+
+    def wait(self, handle: Callable) -> None:
+        """Handle messages until every shard writer is done"""
+        while len(self.finished) < len(self.processes):
+            self.receive(handle, block=True)
+        for process in self.processes:
+            process.join()
+
+    def stop(self) -> None:
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+def run_sharded_import(database_path: str, sources: List[RecordSource], shards: int,
+                       progress_callback: Optional[Callable[[int, int], None]] = None,
+                       pragmas: Optional[Dict[str, object]] = None,
+                       metrics_path: Optional[str] = None,
+                       sign_index: bool = False) -> ImportStats:
+    """
+    Replace import written by several processes. The records are partitioned
+    by artifact id; each shard writer process builds a database of its own
+    with the bulk writer and cleans the ATF of its records, then the shards
+    are merged into the database with ATTACH DATABASE and INSERT ... SELECT.
+
+    The records are decoded in this process and pickled to the writers, so
+    JSON parsing stays on one core: sharding only pays off with a free core
+    per writer (on a single core it is about three times slower than a bulk
+    import).
+
+    Lookup entities found in several shards are kept once and the lowest
+    shard holding them wins. A sequential import keeps the values of the
+    first record in input order instead, so entities exported with
+    conflicting values (e.g. a period with two sequence numbers) can differ.
+    Interrupted sharded imports start over, they are not checkpointed.
+
+    Args:
+        database_path: Path to the SQLite database, rebuilt from the sources
+        sources: Record sources to import, in order
+        shards: Number of shard writer processes
+        progress_callback: Called with (processed, total) as shards commit batches
+        pragmas: SQLite pragmas applied to the database during the merge
+        metrics_path: JSON file receiving the time spent in each stage
+        sign_index: Build the sign n-gram index after the merge
+
+    Returns:
+        ImportStats: Counters and timing of the run
+    """
+    start_time = time.time()
+    total_records = sum(len(source) for source in sources)
+    stats = ImportStats(total_records=total_records)
+    metrics = ImportMetrics()
+    logger.info("Starting sharded database operation at %s", datetime.now().isoformat())
+    logger.info("Total records to process: %d from %d sources, %d shards", total_records, len(sources), shards)
+
+    # Each shard writes its batches in order, so results are matched to the
+    # sources of the oldest batch sent to the shard
+    batch_sources: List[Deque[Set[str]]] = [deque() for _ in range(shards)]
+    failed_sources: Set[str] = set()
+
+    def handle(shard: int, processed: int, failed: int) -> None:
+        names = batch_sources[shard].popleft()
+        if failed:
+            failed_sources.update(names)
+        stats.processed_records += processed
+        stats.failed_records += failed
+        if progress_callback:
+            progress_callback(stats.processed_records + stats.failed_records, total_records)
+
+    writers = _ShardWriters(database_path, shards)
+    engine = None
+    try:
+        with metrics.stage('setup'):
+            writers.start()
+
+        pending: List[List[dict]] = [[] for _ in range(shards)]
+        pending_sources: List[Set[str]] = [set() for _ in range(shards)]
+
+        def dispatch(shard: int) -> None:
+            batch_sources[shard].append(pending_sources[shard])
+            writers.send(shard, pending[shard])
+            pending[shard] = []
+            pending_sources[shard] = set()
+
+        for name, record in metrics.timed(_iter_records(sources), 'parse'):
+            root_id = record.get('id') if hasattr(record, 'get') else None
+            # Records without an id are skipped by the writer, any shard counts them
+            shard = shard_of(root_id, shards) if root_id is not None else 0
+            pending[shard].append(record)
+            pending_sources[shard].add(name)
+            if len(pending[shard]) >= BATCH_SIZE:
+                with metrics.stage('dispatch'):
+                    dispatch(shard)
+                    writers.receive(handle)
+        with metrics.stage('dispatch'):
+            for shard in range(shards):
+                if pending[shard]:
+                    dispatch(shard)
+                writers.send(shard, None)
+        with metrics.stage('shard_write'):
+            writers.wait(handle)
+        if writers.errors:
+            raise RuntimeError(f"Shard writers failed: {'; '.join(writers.errors)}")
+
+        with metrics.stage('merge'):
+            engine = create_import_engine(database_path, pragmas)
+            count_queries(engine, metrics)
+            if pragmas:
+                stats.pragmas = read_pragmas(engine, pragmas)
+            with engine.begin() as connection:
+                drop_fulltext(connection)
+                drop_sign_index(connection)
+            Base.metadata.drop_all(engine)
+            Base.metadata.create_all(engine)
+            with engine.connect() as connection:
+                drop_secondary_indexes(connection)
+                connection.commit()
+                merge_shards(connection, writers.paths)
+        with metrics.stage('index_build'):
+            build_deferred_indexes(engine, stats)
+        with metrics.stage('fulltext_build'):
+            build_fulltext_index(engine, stats)
+        if sign_index:
+            with metrics.stage('sign_index_build'):
+                rebuild_sign_index(engine, stats)
+        with metrics.stage('finalize'):
+            with engine.begin() as connection:
+                clear_checkpoints(connection, [source.name for source in sources])
+                # Sources with failed records are not marked imported, so that append imports retry them
+                record_imported_files(connection, [(source.fingerprint, len(source)) for source in sources
+                                                   if source.fingerprint is not None
+                                                   and source.name not in failed_sources])
+        stats.total_time = time.time() - start_time
+
+        logger.info("=== Sharded Database Operation Summary ===")
+        logger.info("Total time: %.2fs", stats.total_time)
+        logger.info("Records processed: %d", stats.processed_records)
+        logger.info("Records failed: %d", stats.failed_records)
+        logger.info("Average speed: %.1f records/s", stats.records_per_second)
+        for line in metrics.summary_lines():
+            logger.info("Stage %s", line)
+
+    except Exception as e:
+        stats.error = str(e)
+        stats.total_time = time.time() - start_time
+        logger.error("=== Sharded Database Operation Failed ===")
+        logger.error("Error: %s", e, exc_info=True)
+    finally:
+        writers.stop()
+        if engine is not None and pragmas:
+            try:
+                restore_safe_pragmas(engine)
+            except Exception as e:
+                logger.error("Failed to restore safe pragmas: %s", e)
+        try:
+            _remove_files(writers.paths)
+        except OSError as e:
+            logger.error("Failed to remove shard databases: %s", e)
+        stats.stages = metrics.stage_seconds()
+        stats.queries = metrics.queries
+        if metrics_path:
+            try:
+                metrics.write(metrics_path, shards=shards,
+                              **metrics_summary(database_path, WRITE_ENGINE_BULK, IMPORT_MODE_REPLACE, stats))
+                stats.metrics_path = metrics_path
+            except Exception as e:
+                logger.error("Failed to write metrics: %s", e)
+
+    return stats
@@ -0,0 +1,376 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from database.engine import create_import_engine
+from utils.text_cleaner import replace_characters, sign_lines, split_signs
+from utils.logger import logger
+
+SIGN_NGRAM_TABLE = 'sign_ngram'
+SIGN_POSTINGS_TABLE = 'sign_postings'
+SIGN_STATE_TABLE = 'sign_index_state'  # One row, whether inscriptions changed since the build
+MAX_NGRAM = 3  # Unigrams, bigrams and trigrams
+NGRAM_SEPARATOR = ' '  # Signs never contain whitespace
+BLOCK_POSTINGS = 512  # Postings encoded per BLOB, range queries skip whole blocks
+FLUSH_POSTINGS = 2_000_000  # Postings held in memory before blocks are written
+BUILD_CHUNK_ROWS = 1000  # Inscriptions read per round trip while building
+LOOKUP_CHUNK = 500  # Inscription ids per IN (...) lookup, below SQLite's parameter limit
+
+_CREATE_STATEMENTS = (
+    f"""CREATE TABLE {SIGN_NGRAM_TABLE} (
+        ngram_id INTEGER PRIMARY KEY,
+        ngram TEXT NOT NULL UNIQUE,
+        size INTEGER NOT NULL,
+        postings INTEGER NOT NULL,
+        documents INTEGER NOT NULL)""",
+    f"""CREATE TABLE {SIGN_POSTINGS_TABLE} (
+        ngram_id INTEGER NOT NULL,
+        block INTEGER NOT NULL,
+        first_inscription INTEGER NOT NULL,
+        last_inscription INTEGER NOT NULL,
+        postings INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (ngram_id, block)) WITHOUT ROWID""",
+    f"CREATE TABLE {SIGN_STATE_TABLE} (stale INTEGER NOT NULL)",
+    f"INSERT INTO {SIGN_STATE_TABLE} VALUES (0)",
+)
+
+Posting = Tuple[int, int]  # (inscription_id, line position in cleaned_transliteration)
+
+@dataclass
+class SignIndexStats:
+    """Size and build time of the sign index"""
+    inscriptions: int = 0
+    lines: int = 0
+    ngrams: int = 0
+    postings: int = 0
+    blocks: int = 0
+    bytes: int = 0
+    total_time: float = 0.0
+
+class SignMatch(NamedTuple):
+    """An inscription containing a sign sequence"""
+    artifact_id: int
+    inscription_id: int
+    lines: List[int]  # 1-based positions in cleaned_transliteration
+
+@dataclass
+class _NgramEntry:
+    ngram_id: int
+    blocks: int = 0
+    postings: int = 0
+    documents: int = 0
+    last_inscription: int = -1
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def encode_postings(postings: Iterable[Posting]) -> bytes:
+    """
+    Encode sorted, distinct postings as LEB128 varints: the gap to the
+    previous inscription id, then the line, as a gap to the previous line
+    when the inscription is the same. Most postings take two bytes.
+    """
+    out = bytearray()
+    previous_id = previous_line = 0
+    for inscription_id, line in postings:
+        gap = inscription_id - previous_id
+        line_value = line - previous_line if gap == 0 else line
+        # Single byte values are by far the most common
+        if gap < 0x80:
+            out.append(gap)
+        else:
+            _write_varint(out, gap)
+        if line_value < 0x80:
+            out.append(line_value)
+        else:
+            _write_varint(out, line_value)
+        previous_id, previous_line = inscription_id, line
+    return bytes(out)
+
+def decode_postings(data: bytes) -> List[Posting]:
+    """Inverse of encode_postings"""
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    postings = []
+    inscription_id = line = 0
+    for gap, line_value in zip(values[0::2], values[1::2]):
+        if gap:
+            inscription_id += gap
+            line = line_value
+        else:
+            line += line_value
+        postings.append((inscription_id, line))
+    return postings
+
+def has_sign_index(connection: Connection) -> bool:
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SIGN_NGRAM_TABLE,)).first() is not None
+
+def drop_sign_index(connection: Connection) -> None:
+    """Drop the sign index, which would otherwise point to replaced inscriptions"""
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {SIGN_POSTINGS_TABLE}")
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {SIGN_NGRAM_TABLE}")
+    connection.exec_driver_sql(f"DROP TABLE IF EXISTS {SIGN_STATE_TABLE}")
+
+def mark_sign_index_stale(connection: Connection) -> bool:
+    """
+    Flag the sign index as out of date, e.g. before an append import changes
+    inscriptions. Rebuilding it would cost as much as the whole database, so
+    it is left to 'cli.py sign-index' or the next import run with the index.
+
+    Returns:
+        bool: True if the database has a sign index
+    """
+    if not has_sign_index(connection):
+        return False
+    connection.exec_driver_sql(f"CREATE TABLE IF NOT EXISTS {SIGN_STATE_TABLE} (stale INTEGER NOT NULL)")
+    connection.exec_driver_sql(f"DELETE FROM {SIGN_STATE_TABLE}")
+    connection.exec_driver_sql(f"INSERT INTO {SIGN_STATE_TABLE} VALUES (1)")
+    return True
+
+def is_sign_index_stale(connection: Connection) -> bool:
+    """Whether inscriptions changed since the sign index was built"""
+    if not has_sign_index(connection):
+        return False
+    try:
+        row = connection.exec_driver_sql(f"SELECT stale FROM {SIGN_STATE_TABLE}").first()
+    except OperationalError:
+        # Indexes built before the state table existed
+        return False
+    return bool(row and row[0])
+
+def line_ngrams(signs: Sequence[str]) -> set:
+    """Distinct sign n-grams of a line, up to MAX_NGRAM signs long"""
+    return {NGRAM_SEPARATOR.join(signs[start:start + size])
+            for size in range(1, MAX_NGRAM + 1)
+            for start in range(len(signs) - size + 1)}
+
+def _flush(connection: Connection, pending: Dict[str, List[int]], entries: Dict[str, _NgramEntry],
+           stats: SignIndexStats) -> None:
+    """Encode the pending postings of each n-gram into blocks appended after its previous ones"""
+    rows = []
+    for ngram, flat in pending.items():
+        entry = entries.get(ngram)
+        if entry is None:
+            entry = entries[ngram] = _NgramEntry(len(entries) + 1)
+        inscription_ids = flat[0::2]
+        postings = list(zip(inscription_ids, flat[1::2]))
+        # Postings are sorted, only the first inscription can continue the previous flush
+        entry.documents += len(set(inscription_ids)) - (inscription_ids[0] == entry.last_inscription)
+        entry.last_inscription = inscription_ids[-1]
+        for start in range(0, len(postings), BLOCK_POSTINGS):
+            block = postings[start:start + BLOCK_POSTINGS]
+            data = encode_postings(block)
+            rows.append((entry.ngram_id, entry.blocks, block[0][0], block[-1][0], len(block), data))
+            entry.blocks += 1
+            stats.bytes += len(data)
+        entry.postings += len(postings)
+    if rows:
+        connection.exec_driver_sql(f"INSERT INTO {SIGN_POSTINGS_TABLE} VALUES (?, ?, ?, ?, ?, ?)", rows)
+        stats.blocks += len(rows)
+    pending.clear()
+
+def build_sign_index(connection: Connection) -> SignIndexStats:
+    """
+    Build the sign n-gram inverted index from the cleaned transliterations.
+
+    Inscriptions are read in id order, so the postings of each n-gram come
+    sorted and the blocks written at every flush simply follow the previous
+    ones: memory is bounded by FLUSH_POSTINGS, not by the corpus.
+
+    Returns:
+        SignIndexStats: Size and build time of the index
+    """
+    start_time = time.time()
+    stats = SignIndexStats()
+    drop_sign_index(connection)
+    for statement in _CREATE_STATEMENTS:
+        connection.exec_driver_sql(statement)
+
+    entries: Dict[str, _NgramEntry] = {}
+    pending: Dict[str, List[int]] = {}
+    pending_postings = 0
+    last_id = -1
+    while True:
+        # Read in pages, so that no cursor stays open on the connection being written to
+        rows = connection.exec_driver_sql(
+            "SELECT inscription_id, cleaned_transliteration FROM inscription "
+            "WHERE inscription_id > ? AND cleaned_transliteration IS NOT NULL "
+            "ORDER BY inscription_id LIMIT ?", (last_id, BUILD_CHUNK_ROWS)).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        for inscription_id, text in rows:
+            stats.inscriptions += 1
+            for line, signs in sign_lines(text):
+                stats.lines += 1
+                for ngram in line_ngrams(signs):
+                    flat = pending.get(ngram)
+                    if flat is None:
+                        flat = pending[ngram] = []
+                    flat.append(inscription_id)
+                    flat.append(line)
+                    pending_postings += 1
+        if pending_postings >= FLUSH_POSTINGS:
+            stats.postings += pending_postings
+            pending_postings = 0
+            _flush(connection, pending, entries, stats)
+    stats.postings += pending_postings
+    _flush(connection, pending, entries, stats)
+
+    if entries:
+        connection.exec_driver_sql(
+            f"INSERT INTO {SIGN_NGRAM_TABLE} VALUES (?, ?, ?, ?, ?)",
+            [(entry.ngram_id, ngram, ngram.count(NGRAM_SEPARATOR) + 1, entry.postings, entry.documents)
+             for ngram, entry in entries.items()])
+    stats.ngrams = len(entries)
+    stats.total_time = time.time() - start_time
+    logger.info("Sign index: %d n-grams, %d postings in %d blocks (%d bytes) built in %.2fs",
+                stats.ngrams, stats.postings, stats.blocks, stats.bytes, stats.total_time)
+    return stats
+
+def query_ngrams(signs: Sequence[str]) -> List[str]:
+    """
+    N-grams looked up for a sign sequence: the sequence itself up to
+    MAX_NGRAM signs, otherwise trigrams covering it
+    """
+    if len(signs) <= MAX_NGRAM:
+        return [NGRAM_SEPARATOR.join(signs)]
+    starts = list(range(0, len(signs) - MAX_NGRAM + 1, MAX_NGRAM))
+    if starts[-1] != len(signs) - MAX_NGRAM:
+        starts.append(len(signs) - MAX_NGRAM)
+    return list(dict.fromkeys(NGRAM_SEPARATOR.join(signs[start:start + MAX_NGRAM]) for start in starts))
+
+def read_postings(connection: Connection, ngram_id: int, low: Optional[int] = None,
+                  high: Optional[int] = None) -> List[Posting]:
+    """Postings of an n-gram, only decoding the blocks overlapping inscriptions low to high"""
+    statement = f"SELECT data FROM {SIGN_POSTINGS_TABLE} WHERE ngram_id = ?"
+    parameters: list = [ngram_id]
+    if low is not None and high is not None:
+        statement += " AND last_inscription >= ? AND first_inscription <= ?"
+        parameters += [low, high]
+    postings = []
+    for (data,) in connection.exec_driver_sql(statement + " ORDER BY block", tuple(parameters)):
+        postings.extend(decode_postings(data))
+    if low is not None and high is not None:
+        postings = [posting for posting in postings if low <= posting[0] <= high]
+    return postings
+
+def _candidates(connection: Connection, signs: Sequence[str]) -> List[Posting]:
+    """Postings holding every n-gram of the sequence, rarest n-gram first"""
+    ngrams = query_ngrams(signs)
+    placeholders = ', '.join('?' for _ in ngrams)
+    found = connection.exec_driver_sql(
+        f"SELECT ngram_id, postings FROM {SIGN_NGRAM_TABLE} WHERE ngram IN ({placeholders}) ORDER BY postings",
+        tuple(ngrams)).fetchall()
+    if len(found) < len(ngrams):
+        return []
+    candidates = set(read_postings(connection, found[0].ngram_id))
+    for ngram_id, _ in found[1:]:
+        if not candidates:
+            break
+        low = min(inscription_id for inscription_id, _ in candidates)
+        high = max(inscription_id for inscription_id, _ in candidates)
+        candidates.intersection_update(read_postings(connection, ngram_id, low, high))
+    return sorted(candidates)
+
+def _contains(signs: Sequence[str], sequence: Sequence[str]) -> bool:
+    size = len(sequence)
+    return any(signs[start:start + size] == sequence for start in range(len(signs) - size + 1))
+
+def find_sign_sequence(connection: Connection, sequence: Union[str, Sequence[str]],
+                       limit: Optional[int] = None) -> List[SignMatch]:
+    """
+    Find the inscriptions containing a sign sequence within one line
+
+    Sequences of up to MAX_NGRAM signs are answered from their own posting
+    list. Longer ones intersect the postings of covering trigrams and check
+    the remaining candidate lines against the transliteration.
+
+    Args:
+        connection: Connection to a database with a sign index
+        sequence: Transliterated text such as "{d}en-lil2 lugal-e", or its
+            signs. ATF spellings (sz, s,, t,, h, _logograms_) are converted
+            like the indexed transliterations.
+        limit: Maximum number of inscriptions returned, in inscription order
+
+    Returns:
+        List[SignMatch]: Matching inscriptions with the lines holding the sequence
+    """
+    text = sequence if isinstance(sequence, str) else NGRAM_SEPARATOR.join(sequence)
+    signs = split_signs(replace_characters(text))
+    if not signs:
+        raise ValueError("The sign sequence is empty")
+    if not has_sign_index(connection):
+        raise RuntimeError("The database has no sign index, build it with 'cli.py sign-index'")
+    if is_sign_index_stale(connection):
+        logger.warning("The sign index is out of date, rebuild it with 'cli.py sign-index'")
+
+    lines_by_inscription: Dict[int, List[int]] = {}
+    for inscription_id, line in _candidates(connection, signs):
+        lines_by_inscription.setdefault(inscription_id, []).append(line)
+    verify = len(signs) > MAX_NGRAM
+
+    matches = []
+    inscription_ids = list(lines_by_inscription)
+    for start in range(0, len(inscription_ids), LOOKUP_CHUNK):
+        chunk = inscription_ids[start:start + LOOKUP_CHUNK]
+        placeholders = ', '.join('?' for _ in chunk)
+        rows = connection.exec_driver_sql(
+            f"SELECT inscription_id, artifact_id, cleaned_transliteration FROM inscription "
+            f"WHERE inscription_id IN ({placeholders}) ORDER BY inscription_id", tuple(chunk))
+        for inscription_id, artifact_id, text in rows:
+            lines = lines_by_inscription[inscription_id]
+            if verify:
+                text_lines = dict(sign_lines(text))
+                lines = [line for line in lines if _contains(text_lines.get(line, []), signs)]
+            if lines:
+                matches.append(SignMatch(artifact_id, inscription_id, lines))
+                if limit is not None and len(matches) >= limit:
+                    return matches
+    return matches
+
+def _open(database_path: str):
+    if not os.path.exists(database_path):
+        raise FileNotFoundError(f"Database not found: {database_path}")
+    return create_import_engine(database_path)
+
+def index_database(database_path: str) -> SignIndexStats:
+    """build_sign_index on a database file"""
+    engine = _open(database_path)
+    try:
+        with engine.begin() as connection:
+            return build_sign_index(connection)
+    finally:
+        engine.dispose()
+
+def sign_index_stale(database_path: str) -> bool:
+    """is_sign_index_stale on a database file"""
+    engine = _open(database_path)
+    try:
+        with engine.connect() as connection:
+            return is_sign_index_stale(connection)
+    finally:
+        engine.dispose()
+
+def search_signs(database_path: str, sequence: str, limit: Optional[int] = None) -> List[SignMatch]:
+    """find_sign_sequence on a database file"""
+    engine = _open(database_path)
+    try:
+        with engine.connect() as connection:
+            return find_sign_sequence(connection, sequence, limit)
+    finally:
+        engine.dispose()
@@ -10,10 +10,10 @@ class Identification(Base):
     
     root_id = Column(Integer, primary_key=True)  # Primary key
     composite_no = Column(String, nullable=True)  # Composite number
-    designation = Column(String, nullable=True)  # Designation of the artifact
+    designation = Column(String, nullable=True, index=True)  # Designation of the artifact
     artifact_type_comments = Column(String, nullable=True)  # Artifact type comments
-    excavation_no = Column(String, nullable=True)  # Excavation number
-    museum_no = Column(String, nullable=True)  # Museum number
+    excavation_no = Column(String, nullable=True, index=True)  # Excavation number
+    museum_no = Column(String, nullable=True, index=True)  # Museum number
     findspot_comments = Column(String, nullable=True)  # Findspot comments
     findspot_square = Column(String, nullable=True)  # Findspot square
     thickness = Column(Float, nullable=True)  # Thickness of artifact
@@ -36,7 +36,7 @@ class Inscription(Base):
     __tablename__ = 'inscription'
     
     inscription_id = Column(Integer, primary_key=True)  # Primary key for inscriptions
-    artifact_id = Column(Integer, ForeignKey('identification.root_id'), nullable=False)  # Foreign key to identification
+    artifact_id = Column(Integer, ForeignKey('identification.root_id'), nullable=False, index=True)  # Foreign key to identification
     raw_atf = Column(Text, nullable=True)  # Inscription text
     cleaned_transliteration = Column(Text, nullable=True)  # Cleaned transliteration of the inscription
     existing_translation = Column(Text, nullable=True)  # Existing translation of the inscription
@@ -70,8 +70,8 @@ class ArtifactPublication(Base):
     __tablename__ = 'artifact_publications'
 
     id = Column(Integer, primary_key=True)
-    artifact_id = Column(Integer, ForeignKey('identification.root_id'))
-    publication_id = Column(Integer, ForeignKey('publications.id'))
+    artifact_id = Column(Integer, ForeignKey('identification.root_id'), index=True)
+    publication_id = Column(Integer, ForeignKey('publications.id'), index=True)
     exact_reference = Column(String, nullable=True)
 
     # Relationships
@@ -95,8 +95,8 @@ class ArtifactMaterial(Base):
     __tablename__ = 'artifact_materials'
 
     id = Column(Integer, primary_key=True)
-    artifact_id = Column(Integer, ForeignKey('identification.root_id'))
-    material_id = Column(Integer, ForeignKey('materials.id'))
+    artifact_id = Column(Integer, ForeignKey('identification.root_id'), index=True)
+    material_id = Column(Integer, ForeignKey('materials.id'), index=True)
 
     # Relationships
     identification = relationship("Identification", back_populates="materials")
@@ -119,8 +119,8 @@ class ArtifactLanguage(Base):
     __tablename__ = 'artifact_languages'
 
     id = Column(Integer, primary_key=True)
-    artifact_id = Column(Integer, ForeignKey('identification.root_id'))
-    language_id = Column(Integer, ForeignKey('languages.id'))
+    artifact_id = Column(Integer, ForeignKey('identification.root_id'), index=True)
+    language_id = Column(Integer, ForeignKey('languages.id'), index=True)
 
     # Relationships
     identification = relationship("Identification", back_populates="languages")
@@ -143,8 +143,8 @@ class ArtifactGenre(Base):
     __tablename__ = 'artifact_genres'
 
     id = Column(Integer, primary_key=True)
-    artifact_id = Column(Integer, ForeignKey('identification.root_id'))
-    genre_id = Column(Integer, ForeignKey('genres.id'))
+    artifact_id = Column(Integer, ForeignKey('identification.root_id'), index=True)
+    genre_id = Column(Integer, ForeignKey('genres.id'), index=True)
     comments = Column(Text, nullable=True)
 
     # Relationships
@@ -171,8 +171,8 @@ class ArtifactExternalResource(Base):
     __tablename__ = 'artifact_external_resources'
 
     id = Column(Integer, primary_key=True)
-    artifact_id = Column(Integer, ForeignKey('identification.root_id'))
-    external_resource_id = Column(Integer, ForeignKey('external_resources.id'))
+    artifact_id = Column(Integer, ForeignKey('identification.root_id'), index=True)
+    external_resource_id = Column(Integer, ForeignKey('external_resources.id'), index=True)
     external_resource_key = Column(String, nullable=True)
 
     # Relationships
@@ -197,8 +197,8 @@ class ArtifactCollection(Base):
     __tablename__ = 'artifact_collections'
 
     id = Column(Integer, primary_key=True)
-    artifact_id = Column(Integer, ForeignKey('identification.root_id'))
-    collection_id = Column(Integer, ForeignKey('collections.id'))
+    artifact_id = Column(Integer, ForeignKey('identification.root_id'), index=True)
+    collection_id = Column(Integer, ForeignKey('collections.id'), index=True)
 
     # Relationships
     identification = relationship("Identification", back_populates="collections")
@@ -220,8 +220,8 @@ class ArtifactPeriod(Base):
     __tablename__ = 'artifact_periods'
 
     id = Column(Integer, primary_key=True)
-    artifact_id = Column(Integer, ForeignKey('identification.root_id'))
-    period_id = Column(Integer, ForeignKey('periods.id'))
+    artifact_id = Column(Integer, ForeignKey('identification.root_id'), index=True)
+    period_id = Column(Integer, ForeignKey('periods.id'), index=True)
 
     # Relationships
     identification = relationship("Identification", back_populates="periods")
@@ -245,9 +245,31 @@ class ArtifactProvenience(Base):
     __tablename__ = 'artifact_proveniences'
 
     id = Column(Integer, primary_key=True)
-    artifact_id = Column(Integer, ForeignKey('identification.root_id'))
-    provenience_id = Column(Integer, ForeignKey('proveniences.id'))
+    artifact_id = Column(Integer, ForeignKey('identification.root_id'), index=True)
+    provenience_id = Column(Integer, ForeignKey('proveniences.id'), index=True)
 
     # Relationships
     identification = relationship("Identification", back_populates="proveniences")
     provenience = relationship("Provenience", back_populates="artifact_proveniences")
+
+# Progress journal of imports, used to resume an interrupted import
+class ImportCheckpoint(Base):
+    __tablename__ = 'import_checkpoints'
+
+    source = Column(String, primary_key=True)  # Source file of the records
+    record_index = Column(Integer, nullable=False)  # Records of the source already committed
+    record_count = Column(Integer, nullable=True)  # Records in the source when the import started
+    content_hash = Column(String, nullable=True)  # Content hash of the source file when the import started
+    failed_records = Column(Integer, nullable=False, default=0)  # Records of failed batches
+    updated_at = Column(String, nullable=True)  # ISO timestamp of the last checkpoint
+
+# Fingerprints of the files already imported, used to skip them on incremental imports
+class ImportedFile(Base):
+    __tablename__ = 'imported_files'
+
+    path = Column(String, primary_key=True)  # Absolute path of the file
+    size = Column(Integer, nullable=False)  # Size in bytes
+    mtime = Column(Float, nullable=False)  # Modification time
+    content_hash = Column(String, nullable=False, index=True)  # BLAKE2b digest of the content
+    record_count = Column(Integer, nullable=True)  # Records read from the file
+    imported_at = Column(String, nullable=True)  # ISO timestamp of the import
@@ -31,9 +31,8 @@ class HelpTab:
             "2. Enable logging to track operations in the /logs directory.\n\n"
             
             "Note: The database import process may take a few minutes depending on the "
-            "size of your files. You can track the progress in the Import tab."
-            "Please note that the window can sometimes freeze when importing massive files."
-            "The freeze has no impact on the final result."
+            "size of your files. It runs in the background, so the window stays usable "
+            "and you can track the progress in the Import tab."
         )
         
         # Scrolled text widget for help content
@@ -1,7 +1,12 @@
 import tkinter as tk
-from tkinter import ttk, Listbox, Frame
-from utils.file_handler import select_and_clean_files, get_cleaned_data, check_database, file_handler
-from database.processor import send_to_database
+from tkinter import ttk, Listbox, Frame, messagebox
+from utils.file_handler import select_and_clean_files, get_sources, check_database, file_handler
+from ui.progress_tracker import ProgressTracker
+from ui.import_worker import ImportWorker, MESSAGE_PROGRESS, MESSAGE_DONE, MESSAGE_ERROR
+from utils.config_manager import load_config, DEFAULT_CONFIG
+from utils.metrics import default_metrics_path
+
+POLL_INTERVAL_MS = 100  # How often the GUI checks the import worker for news
 
 def create_import_tab(notebook):
     """Create and return the import tab"""
@@ -33,21 +38,125 @@ def create_import_tab(notebook):
 
     # Import button
     send_button = tk.Button(button_frame, text="Send to SQLite", 
-                          command=lambda: handle_send_to_database(frame))
+                          command=lambda: handle_send_to_database(
+                              frame, [select_files_button, delete_button, send_button]))
     send_button.pack(side="right", ipady=2, ipadx=5)
 
     return frame
 
-def handle_send_to_database(frame):
+def handle_send_to_database(frame, buttons=()):
     """Handle sending data to database"""
     database_path = check_database()
     if not database_path:
         return
     
-    cleaned_data = get_cleaned_data()
-    if not cleaned_data:
+    if file_handler.is_scanning():
+        messagebox.showinfo("Scanning", "The selected files are still being scanned, please wait.")
+        return
+
+    sources = get_sources()
+    if not any(len(source) for source in sources):
         tk.messagebox.showerror("No Data", 
                               "No valid JSON data to send to the database.")
         return
+
+    resume = ask_resume(database_path, sources)
+    if resume is None:
+        return
     
-    send_to_database(frame, database_path, cleaned_data)
+    # Keep the selection unchanged while the worker reads it
+    for button in buttons:
+        button.config(state=tk.DISABLED)
+
+    def enable_buttons():
+        for button in buttons:
+            button.config(state=tk.NORMAL)
+
+    send_to_database(frame, database_path, sources, on_finish=enable_buttons, resume=resume)
+
+def ask_resume(database_path: str, sources: list):
+    """
+    Ask whether to continue an interrupted import of the same files or to
+    start over, like the CLI's --restart
+
+    Returns:
+        bool: True to resume, False to start over, None when cancelled
+    """
+    # Imported here so that SQLAlchemy is only loaded once an import is requested
+    from database.checkpoints import pending_checkpoints
+
+    checkpoints = pending_checkpoints(database_path, [source.name for source in sources])
+    if not checkpoints:
+        return True
+    committed = sum(checkpoint.record_index for checkpoint in checkpoints.values())
+    return messagebox.askyesnocancel(
+        "Interrupted Import",
+        f"An interrupted import of {len(checkpoints)} of these files already committed "
+        f"{committed} records.\n\nResume it? Choose No to start over.")
+
+def _run_import(**kwargs):
+    """
+    Run the import, loading the database layer (SQLAlchemy and the models) on
+    the worker thread the first time, so that neither the startup nor the
+    window waits for it
+    """
+    from database.processor import run_import
+    return run_import(**kwargs)
+
+def send_to_database(frame: tk.Frame, database_path: str, sources: list, on_finish=None, resume: bool = True):
+    """
+    Import record sources on a background worker while showing progress and
+    the outcome in the GUI
+    """
+    if not database_path or not sources:
+        return
+
+    progress_tracker = ProgressTracker(frame, sum(len(source) for source in sources))
+    config = load_config()
+    metrics_dir = config.get('metrics_dir', DEFAULT_CONFIG['metrics_dir'])
+    worker = ImportWorker(_run_import, database_path=database_path, sources=sources,
+                          write_engine=config.get('write_engine', DEFAULT_CONFIG['write_engine']),
+                          import_mode=config.get('import_mode', DEFAULT_CONFIG['import_mode']),
+                          pragmas=config.get('import_pragmas', DEFAULT_CONFIG['import_pragmas']),
+                          atf_workers=config.get('atf_workers', DEFAULT_CONFIG['atf_workers']),
+                          defer_indexes=config.get('defer_index_build', DEFAULT_CONFIG['defer_index_build']),
+                          metrics_path=default_metrics_path(metrics_dir) if metrics_dir else None,
+                          shards=config.get('import_shards', DEFAULT_CONFIG['import_shards']),
+                          sign_index=config.get('build_sign_index', DEFAULT_CONFIG['build_sign_index']),
+                          resume=resume)
+
+    def finish():
+        progress_tracker.destroy()
+        if on_finish:
+            on_finish()
+
+    def poll_worker():
+        for message in worker.poll():
+            if message[0] == MESSAGE_PROGRESS:
+                _, processed, total, records_per_second = message
+                progress_tracker.update(processed, total, records_per_second)
+            elif message[0] == MESSAGE_DONE:
+                show_import_result(message[1])
+                finish()
+                return
+            elif message[0] == MESSAGE_ERROR:
+                messagebox.showerror("Import Failed", message[1])
+                finish()
+                return
+        frame.after(POLL_INTERVAL_MS, poll_worker)
+
+    worker.start()
+    frame.after(POLL_INTERVAL_MS, poll_worker)
+
+def show_import_result(stats):
+    """Tell the user how the import went"""
+    if stats.error:
+        messagebox.showerror("Import Failed", f"The import failed: {stats.error}")
+    elif stats.failed_records == 0:
+        resumed = f" (resumed after {stats.resumed_records})" if stats.resumed_records else ""
+        timings = f"\n\nStage timings saved to {stats.metrics_path}" if stats.metrics_path else ""
+        messagebox.showinfo("Success",
+            f"Successfully processed {stats.processed_records} records{resumed}{timings}")
+    else:
+        messagebox.showwarning("Partial Success", 
+            f"Processed {stats.processed_records} records with {stats.failed_records} failures")
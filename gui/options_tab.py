@@ -1,11 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import logging
 from utils.config_manager import load_config, save_config, DEFAULT_CONFIG
 from typing import Optional, Dict, Any
 from pathlib import Path
 import shutil
-from utils.logger import logger
+from utils.logger import logger, Logger
 
 class OptionsTab:
     def __init__(self, notebook):
@@ -80,17 +79,15 @@ class OptionsTab:
         """Update logging state and configuration"""
         try:
             if not enabled:
-                # Remove handlers
-                root_logger = logging.getLogger()
-                for handler in root_logger.handlers[:]:
-                    handler.close()
-                    root_logger.removeHandler(handler)
+                self.logger.info("Logging disabled")
+                # Stop logging first, the log file is closed before it is deleted
+                Logger.configure(enabled=False)
                 
                 # Clean logs
                 self._clean_logs(show_message=False)
-                self.logger.info("Logging disabled")
             else:
-                self.logger 
+                if Logger.get_logger().disabled:
+                    Logger.configure(enabled=True)
                 self.logger.info("Logging enabled")
 
             # Update configuration
@@ -125,6 +122,9 @@ class OptionsTab:
         Args:
             show_message: Whether to show success/error messages to user
         """
+        if self.log_enabled.get():
+            # The current log file is closed before it is deleted
+            Logger.configure(enabled=False)
         self._clean_logs(show_message=show_message)
         if self.log_enabled.get():
             self._update_logging_state(enabled=True)
@@ -1,7 +1,9 @@
-from gui.main_window import create_main_window
-
 def main():
     """Entry point of the application"""
+    # Imported here: the worker processes of imports and scans are spawned, and
+    # re-import this module, so at module level the GUI would load in every one
+    from gui.main_window import create_main_window
+
     root = create_main_window()
     root.mainloop()
 
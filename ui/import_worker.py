@@ -0,0 +1,64 @@
+import queue
+import threading
+import time
+from typing import Callable, List, Tuple
+from utils.logger import logger
+
+# Message kinds sent from the worker thread to the GUI
+MESSAGE_PROGRESS = 'progress'  # (kind, processed, total, records per second)
+MESSAGE_DONE = 'done'          # (kind, result)
+MESSAGE_ERROR = 'error'        # (kind, error message)
+
+class ImportWorker:
+    """
+    Runs an import on a background thread. The worker only puts messages on
+    a queue, which the Tk main loop drains with poll() from an after() callback,
+    so the window stays responsive and never slows down the writes.
+    """
+
+    def __init__(self, target: Callable, **kwargs):
+        """
+        Args:
+            target: Import function accepting a progress_callback keyword
+            kwargs: Arguments passed to the import function
+        """
+        self.target = target
+        self.kwargs = kwargs
+        self.messages: "queue.Queue[Tuple]" = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="import-worker", daemon=True)
+        self.start_time = None
+
+    def start(self) -> None:
+        self.start_time = time.time()
+        self.thread.start()
+
+    def is_alive(self) -> bool:
+        return self.thread.is_alive()
+
+    def _report_progress(self, processed: int, total: int) -> None:
+        elapsed = time.time() - self.start_time
+        self.messages.put((MESSAGE_PROGRESS, processed, total, processed / elapsed if elapsed else 0.0))
+
+    def _run(self) -> None:
+        try:
+            result = self.target(progress_callback=self._report_progress, **self.kwargs)
+            self.messages.put((MESSAGE_DONE, result))
+        except Exception as e:
+            logger.error("Import worker failed: %s", e, exc_info=True)
+            self.messages.put((MESSAGE_ERROR, str(e)))
+
+    def poll(self) -> List[Tuple]:
+        """
+        Drain pending messages without blocking. Consecutive progress
+        messages are collapsed into the latest one.
+        """
+        messages = []
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                return messages
+            if messages and message[0] == MESSAGE_PROGRESS and messages[-1][0] == MESSAGE_PROGRESS:
+                messages[-1] = message
+            else:
+                messages.append(message)
@@ -25,17 +25,20 @@ class ProgressTracker:
         self.start_time = time.time()
         self.progress_bar["maximum"] = total_records
         
-    def update(self, current_index: int, total_records: int):
+    def update(self, current_index: int, total_records: int, records_per_second: float = None):
         self.progress_bar["value"] = current_index
+        if current_index <= 0:
+            return
         elapsed_time = time.time() - self.start_time
         avg_time_per_record = elapsed_time / current_index
         remaining_records = total_records - current_index
         est_time_remaining = avg_time_per_record * remaining_records
         
         minutes, seconds = divmod(est_time_remaining, 60)
-        self.time_label.config(
-            text=f"Estimated Time: {int(minutes)}m {int(seconds)}s remaining"
-        )
+        text = f"Estimated Time: {int(minutes)}m {int(seconds)}s remaining"
+        if records_per_second is not None:
+            text += f" ({records_per_second:.0f} records/s)"
+        self.time_label.config(text=text)
         self.progress_frame.update_idletasks()
     
     def destroy(self):
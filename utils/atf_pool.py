@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+from utils.text_cleaner import clean_atf_batch
+from utils.logger import logger
+
+CleanedAtf = Tuple[Optional[str], Optional[str]]
+
+def usable_cores() -> int:
+    """Cores this process may run on, fewer than the machine has when it is restricted"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+def resolve_worker_count(workers: Optional[int]) -> int:
+    """0 or None means one worker per usable core"""
+    if not workers or workers < 0:
+        return usable_cores()
+    return workers
+
+def batch_atfs(batch: List[dict]) -> List[Optional[str]]:
+    """Return the raw ATF of each record of a batch, None when there is no inscription"""
+    atfs = []
+    for record in batch:
+        inscription = record.get('inscription') if hasattr(record, 'get') else None
+        atfs.append(inscription.get('atf') if isinstance(inscription, Mapping) else None)
+    return atfs
+
+class AtfCleaningPool:
+    """
+    Cleans the inscriptions of whole batches on a process pool ahead of the
+    database writer. Up to one batch per worker is cleaned in advance while
+    the current batch is being written.
+
+    With a single worker the cleaning runs inline and no process is started.
+    Each worker costs a Python start-up (the spawned process re-imports the
+    entry module, e.g. cli.py with SQLAlchemy), and the cleaning of a batch
+    is cheap next to its decoding and writing, so the pool only pays off on
+    several free cores.
+    """
+
+    def __init__(self, workers: Optional[int] = 0):
+        self.workers = resolve_worker_count(workers)
+        self.executor = None
+        if self.workers > 1:
+            # Spawned workers import the text cleaner and the entry module, which
+            # only loads the GUI when run as the main program
+            self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        logger.info("ATF cleaning workers: %d", self.workers)
+
+    def clean_batches(self, batches: Iterable[List[dict]]) -> Iterator[Tuple[List[dict], List[Optional[CleanedAtf]]]]:
+        """
+        Yield each batch along with the cleaned ATF of its records, in order
+
+        Args:
+            batches: Batches of records
+        """
+        if self.executor is None:
+            for batch in batches:
+                yield batch, self._results(batch_atfs(batch), clean_atf_batch)
+            return
+
+        pending: Deque[Tuple[List[dict], List[Optional[str]], Future]] = deque()
+        for batch in batches:
+            atfs = batch_atfs(batch)
+            pending.append((batch, atfs, self.executor.submit(clean_atf_batch, [a for a in atfs if a])))
+            if len(pending) > self.workers:
+                yield self._pop(pending)
+        while pending:
+            yield self._pop(pending)
+
+    def _pop(self, pending: Deque) -> Tuple[List[dict], List[Optional[CleanedAtf]]]:
+        batch, atfs, future = pending.popleft()
+        return batch, self._results(atfs, lambda _: future.result())
+
+    @staticmethod
+    def _results(atfs: List[Optional[str]], clean) -> List[Optional[CleanedAtf]]:
+        """
+        Align the cleaned texts with the records, None for records without ATF.
+        If cleaning fails the writer cleans the batch itself, so the error is
+        reported as a failure of that batch.
+        """
+        try:
+            cleaned = iter(clean([a for a in atfs if a]))
+        except Exception as e:
+            logger.debug("ATF cleaning failed, falling back to inline cleaning: %s", e)
+            return [None] * len(atfs)
+        return [next(cleaned) if atf else None for atf in atfs]
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
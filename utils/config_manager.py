@@ -5,6 +5,23 @@ CONFIG_FILE = "config.json"
 DEFAULT_CONFIG = {
     "database_path": None,
     "logging_enabled": False,
+    "write_engine": "orm",  # "orm" or "bulk" (Core executemany per table)
+    "import_mode": "replace",  # "replace" (rebuild the database) or "append" (upsert)
+    "defer_index_build": False,  # Build secondary indexes once after a replace import
+    "json_backend": "auto",  # "auto" (orjson, then msgspec, then json) or a backend name
+    "atf_workers": 1,  # Processes cleaning ATF ahead of the writer, 1 = inline, 0 = one per core
+    "import_shards": 1,  # Writer processes of replace imports, each building a shard merged at the end
+    "scan_workers": 0,  # Processes scanning selected files, 0 = one per core, 1 = inline
+    "build_sign_index": False,  # Index sign n-grams after each import, for sequence queries
+    "metrics_dir": None,  # Directory receiving the stage timings of every import as JSON, None = off
+    # SQLite pragmas applied to the connections of an import run
+    "import_pragmas": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -262144,  # Negative values are KiB, i.e. 256 MiB
+        "temp_store": "MEMORY",
+        "mmap_size": 268435456,
+    },
 }
 
 def load_config():
@@ -1,20 +1,29 @@
-import json
 import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
-from typing import List, Callable, Optional
-from .config_manager import load_config, save_config
+from typing import Dict, List, Callable, Optional
+from .config_manager import load_config, save_config, DEFAULT_CONFIG
+from .record_source import RecordSource, FileRecordSource
+from .input_files import InputFile, expand_inputs
+from .file_scanner import FileScanner, MESSAGE_SCANNED, MESSAGE_FAILED, MESSAGE_DONE
 from utils.logger import logger
 
+POLL_INTERVAL_MS = 100  # How often the GUI checks the file scanner for scanned files
+
 class FileHandler:
     """Handles all file operations including selection, loading and path management"""
     
     def __init__(self):
         """Initialize FileHandler with default values"""
         self.database_path: Optional[str] = None
-        self.cleaned_data: List[dict] = []
         self.db_path_callbacks: List[Callable] = []
-        self.file_data_map: dict = {}
+        # Selected files by InputFile.name, their records are only read during the import
+        self.sources: Dict[str, FileRecordSource] = {}
+        # Key of the source shown on each listbox row, several files may share a display name.
+        # Rows follow the selection order, which is also the import order.
+        self.rows: List[str] = []
+        self.selection_order: Dict[str, int] = {}
+        self.scanner: Optional[FileScanner] = None
         logger.info("FileHandler initialized")
 
     def register_db_path_callback(self, callback: Callable) -> None:
@@ -103,7 +112,8 @@ class FileHandler:
         try:
             file_paths = filedialog.askopenfilenames(
                 title="Select JSON Files",
-                filetypes=[("JSON Files", "*.json")]
+                filetypes=[("JSON Files", "*.json *.ndjson *.jsonl *.gz *.zst *.zip"),
+                           ("All Files", "*.*")]
             )
             
             if not file_paths:
@@ -112,99 +122,139 @@ class FileHandler:
                 return
 
             logger.info(f"Selected {len(file_paths)} files")
+            inputs = self._expand_selection(file_paths)
             listbox.delete(0, tk.END)
+            self.sources.clear()
+            self.rows.clear()
+            self._scan_files(inputs, listbox)
             
-            for file_path in file_paths:
-                try:
-                    self._process_file(file_path, listbox)
-                except Exception as e:
-                    logger.error(f"Error processing file {file_path}: {str(e)}")
-                    messagebox.showerror("Error", f"Failed to process {os.path.basename(file_path)}")
-                    
         except Exception as e:
             logger.error(f"Error in file selection: {str(e)}")
             messagebox.showerror("Error", "Failed to open file dialog")
 
-    def _process_file(self, file_path: str, listbox: tk.Listbox) -> None:
+    def _expand_selection(self, file_paths: List[str]) -> List[InputFile]:
+        """List the JSON inputs of the selected files, one per member of a zip archive"""
+        inputs = []
+        for file_path in file_paths:
+            try:
+                inputs.extend(expand_inputs(file_path))
+            except Exception as e:
+                logger.error("Error reading archive %s: %s", file_path, e)
+                messagebox.showerror("Error", f"Failed to read {os.path.basename(file_path)}")
+        return inputs
+
+    def _skip_imported_files(self, already_imported: List[str], listbox: tk.Listbox) -> None:
         """
-        Process individual JSON file, handling both single objects and arrays
-        
+        Remove the files already imported into the selected database from
+        the selection, unless the user asks to import them again. The
+        scanner finds them with the fingerprints computed by its workers, so
+        no file is read and no database is opened on the Tk thread.
+
         Args:
-            file_path: Path to JSON file
-            listbox: Tkinter Listbox widget to display file
+            already_imported: Keys of the selected sources already imported
+            listbox: Tkinter Listbox widget displaying the files
         """
-        if not os.path.exists(file_path):
-            logger.error(f"File not found: {file_path}")
+        already_imported = [key for key in already_imported if key in self.sources]
+        if not already_imported:
             return
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                try:
-                    # First try parsing as a single object
-                    data = json.loads(content)
-                    if isinstance(data, dict):
-                        self._add_to_cleaned_data([data], file_path, listbox)
-                    elif isinstance(data, list):
-                        self._add_to_cleaned_data(data, file_path, listbox)
-                    else:
-                        raise ValueError("JSON must contain an object or array of objects")
-                except json.JSONDecodeError as e:
-                    # Try parsing as multiple objects
-                    objects = []
-                    for line in content.splitlines():
-                        line = line.strip()
-                        if line:
-                            try:
-                                obj = json.loads(line)
-                                objects.append(obj)
-                            except json.JSONDecodeError:
-                                continue
-                    if objects:
-                        self._add_to_cleaned_data(objects, file_path, listbox)
-                    else:
-                        raise ValueError("No valid JSON objects found in file")
-        except Exception as e:
-            logger.error(f"Error processing {file_path}: {str(e)}")
-            raise
-
-    def _add_to_cleaned_data(self, data: List[dict], file_path: str, listbox: tk.Listbox) -> None:
-        filename = os.path.basename(file_path)
-        start_idx = len(self.cleaned_data)
-        self.cleaned_data.extend(data)
-        # Store mapping of filename to data indices
-        self.file_data_map[filename] = {
-            'start': start_idx,
-            'count': len(data)
-        }
-        listbox.insert(tk.END, f"{filename} ({len(data)} records)")
-        logger.debug(f"Successfully processed {len(data)} records from: {filename}")
+        names = "\n".join(self.sources[key].input.display_name for key in already_imported[:10])
+        if len(already_imported) > 10:
+            names += f"\n... and {len(already_imported) - 10} more"
+        if messagebox.askyesno("Already Imported",
+                               f"{len(already_imported)} of the selected files were already imported "
+                               f"into this database:\n\n{names}\n\nImport them again?"):
+            return
+
+        for key in already_imported:
+            row = self.rows.index(key)
+            del self.rows[row]
+            del self.sources[key]
+            listbox.delete(row)
+        logger.info("Skipped %d files already imported", len(already_imported))
+
+    def _scan_files(self, inputs: List[InputFile], listbox: tk.Listbox) -> None:
+        """
+        Add JSON files to the selection, handling single objects, arrays and
+        one object per line, plain or compressed. The files are scanned in
+        parallel on worker processes, only their layout and record count are
+        read, and each one is listed as soon as it is scanned.
+
+        Args:
+            inputs: Files to add
+            listbox: Tkinter Listbox widget to display the files
+        """
+        if self.scanner is not None:
+            # The previous selection was replaced before it was fully scanned
+            self.scanner.cancel()
+        if not inputs:
+            self.scanner = None
+            return
+
+        self.selection_order = {input_file.name: index for index, input_file in enumerate(inputs)}
+        config = load_config()
+        scanner = self.scanner = FileScanner(inputs, config.get('scan_workers', DEFAULT_CONFIG['scan_workers']),
+                                             self.database_path,
+                                             config.get('import_mode', DEFAULT_CONFIG['import_mode']))
+        failed = []
+
+        def poll_scanner():
+            if scanner is not self.scanner:
+                return
+            for message in scanner.poll():
+                if message[0] == MESSAGE_SCANNED:
+                    self._add_source(message[1], listbox)
+                elif message[0] == MESSAGE_FAILED:
+                    failed.append(message[1].display_name)
+                elif message[0] == MESSAGE_DONE:
+                    logger.info("Scanned %d files, %d failed", len(inputs), len(failed))
+                    if failed:
+                        names = "\n".join(failed[:10])
+                        if len(failed) > 10:
+                            names += f"\n... and {len(failed) - 10} more"
+                        messagebox.showerror("Error", f"Failed to process {len(failed)} files:\n\n{names}")
+                    # Still counts as scanning, so the selection cannot be imported before the answer
+                    self._skip_imported_files(message[1], listbox)
+                    self.scanner = None
+                    return
+            listbox.after(POLL_INTERVAL_MS, poll_scanner)
+
+        scanner.start()
+        listbox.after(POLL_INTERVAL_MS, poll_scanner)
+
+    def is_scanning(self) -> bool:
+        """Whether selected files are still being scanned"""
+        return self.scanner is not None
+
+    def _add_source(self, source: FileRecordSource, listbox: tk.Listbox) -> None:
+        key = source.input.name
+        if key in self.sources:
+            return
+        self.sources[key] = source
+        # Files are scanned in parallel and arrive in any order, each one is
+        # placed after the files selected before it
+        index = self.selection_order.get(key, len(self.selection_order))
+        row = sum(1 for other in self.rows if self.selection_order.get(other, 0) < index)
+        self.rows.insert(row, key)
+        listbox.insert(row, f"{source.input.display_name} ({len(source)} records)")
+        logger.debug("Selected %d records (%s) from: %s", len(source), source.format, key)
 
     def remove_selected_files(self, listbox: tk.Listbox) -> None:
-        """Remove selected files from listbox and cleaned_data"""
+        """Remove selected files from listbox and from the selection"""
         selected_indices = listbox.curselection()
         if not selected_indices:
             return
 
         # Process in reverse to avoid index shifting
         for idx in sorted(selected_indices, reverse=True):
-            filename = listbox.get(idx).split(" (")[0]
-            if filename in self.file_data_map:
-                file_info = self.file_data_map[filename]
-                # Remove data from cleaned_data
-                del self.cleaned_data[file_info['start']:file_info['start'] + file_info['count']]
-                # Update indices for remaining files
-                for fname, info in self.file_data_map.items():
-                    if info['start'] > file_info['start']:
-                        info['start'] -= file_info['count']
-                del self.file_data_map[filename]
+            self.sources.pop(self.rows.pop(idx), None)
             listbox.delete(idx)
         
         logger.info(f"Removed {len(selected_indices)} files from selection")
 
-    def get_cleaned_data(self) -> List[dict]:
-        """Get the cleaned data"""
-        return self.cleaned_data
+    def get_sources(self) -> List[RecordSource]:
+        """Get the selected files, in selection order"""
+        return [self.sources[key] for key in self.rows]
 
 # Create a single instance of the file
 file_handler = FileHandler()
@@ -213,8 +263,8 @@ file_handler = FileHandler()
 def select_and_clean_files(listbox: tk.Listbox) -> None:
     file_handler.select_and_clean_files(listbox)
 
-def get_cleaned_data() -> List[dict]:
-    return file_handler.get_cleaned_data()
+def get_sources() -> List[RecordSource]:
+    return file_handler.get_sources()
 
 def check_database() -> Optional[str]:
     return file_handler.check_database()
@@ -0,0 +1,156 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple
+from utils.atf_pool import resolve_worker_count
+from utils.fingerprint import fingerprint_input
+from utils.input_files import InputFile
+from utils.record_source import FileRecordSource
+from utils.logger import logger
+
+# Message kinds sent from the scanner thread to the GUI
+MESSAGE_SCANNED = 'scanned'  # (kind, FileRecordSource)
+MESSAGE_FAILED = 'failed'    # (kind, InputFile, error message)
+MESSAGE_DONE = 'done'        # (kind, names of the inputs already imported)
+
+# Selections smaller than this are scanned inline: starting a worker process takes
+# about 0.2 s, in which a few tens of MB are scanned
+POOL_MIN_BYTES = 64 << 20
+
+# (input, its source, None) or (input, None, the error that prevented reading it)
+ScanResult = Tuple[InputFile, Optional[FileRecordSource], Optional[Exception]]
+
+def scan_input(input_file: InputFile) -> FileRecordSource:
+    """
+    Fingerprint an input and read its layout and record count. Runs in the
+    worker processes: the returned source holds no records, so only a few
+    fields travel back to the parent process.
+    """
+    source = FileRecordSource(input_file.path, fingerprint_input(input_file.path, input_file.member),
+                              input_file.member)
+    if not len(source):
+        raise ValueError("No valid JSON objects found in file")
+    return source
+
+def scan_inputs(inputs: List[InputFile], workers: Optional[int] = 0,
+                cancelled: Optional[threading.Event] = None) -> Iterator[ScanResult]:
+    """
+    Scan inputs on a process pool, yielding each one as soon as it is done.
+    Selections under POOL_MIN_BYTES are scanned inline, faster than the
+    workers would start.
+
+    Args:
+        inputs: Files to scan
+        workers: Processes, 0 or None uses every usable core and 1 scans inline
+        cancelled: Stops the scan at the next finished file once set
+    """
+    workers = min(resolve_worker_count(workers), len(inputs))
+    if workers > 1 and _total_size(inputs) < POOL_MIN_BYTES:
+        workers = 1
+    if workers <= 1:
+        for input_file in inputs:
+            if cancelled is not None and cancelled.is_set():
+                return
+            yield _result(input_file, lambda: scan_input(input_file))
+        return
+
+    # Spawned workers import the JSON reader and the entry module, which only
+    # loads the GUI when run as the main program (SQLAlchemy too for cli.py)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {executor.submit(scan_input, input_file): input_file for input_file in inputs}
+        for future in as_completed(futures):
+            if cancelled is not None and cancelled.is_set():
+                for pending in futures:
+                    pending.cancel()
+                return
+            yield _result(futures[future], future.result)
+
+def _total_size(inputs: List[InputFile]) -> int:
+    """Bytes on disk of the inputs, counting each zip archive once"""
+    total = 0
+    for path in {input_file.path for input_file in inputs}:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+def _result(input_file: InputFile, scan) -> ScanResult:
+    try:
+        return input_file, scan(), None
+    except Exception as e:
+        logger.error("Error processing %s: %s", input_file.name, e)
+        return input_file, None, e
+
+class FileScanner:
+    """
+    Scans selected files on a background thread feeding a process pool, so
+    that the window stays responsive. Like the import worker, it only puts
+    messages on a queue that the Tk main loop drains with poll().
+    """
+
+    def __init__(self, inputs: List[InputFile], workers: Optional[int] = 0,
+                 database_path: Optional[str] = None, import_mode: Optional[str] = None):
+        """
+        Args:
+            inputs: Files to scan
+            workers: Processes, 0 or None uses every core and 1 scans inline
+            database_path: Database the files are imported into
+            import_mode: Mode of that import. In append mode the files the
+                database already holds are reported when the scan is done,
+                found with the fingerprints computed by the scan.
+        """
+        self.inputs = inputs
+        self.workers = workers
+        self.database_path = database_path
+        self.import_mode = import_mode
+        self.messages: "queue.Queue[Tuple]" = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="file-scanner", daemon=True)
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def cancel(self) -> None:
+        """Stop scanning, e.g. when another selection replaces this one"""
+        self.cancelled.set()
+
+    def _run(self) -> None:
+        sources = []
+        already_imported = []
+        try:
+            for input_file, source, error in scan_inputs(self.inputs, self.workers, self.cancelled):
+                if source is not None:
+                    sources.append(source)
+                    self.messages.put((MESSAGE_SCANNED, source))
+                else:
+                    self.messages.put((MESSAGE_FAILED, input_file, str(error)))
+            if self.database_path and sources and not self.cancelled.is_set():
+                already_imported = self._already_imported(sources)
+        except Exception as e:
+            logger.error("File scanner failed: %s", e, exc_info=True)
+        finally:
+            self.messages.put((MESSAGE_DONE, already_imported))
+
+    def _already_imported(self, sources: List[FileRecordSource]) -> List[str]:
+        """Names of the scanned sources whose fingerprint the database already holds"""
+        # Imported here, on the scanner thread, so that loading SQLAlchemy never blocks the window
+        from database.imported_files import ImportedFiles
+        from database.processor import IMPORT_MODE_APPEND
+
+        # A replace import rebuilds the database from the selection
+        if self.import_mode != IMPORT_MODE_APPEND:
+            return []
+        imported_files = ImportedFiles.load(self.database_path)
+        return [source.name for source in sources if imported_files.contains(source.fingerprint)]
+
+    def poll(self) -> List[Tuple]:
+        """Drain pending messages without blocking"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
@@ -0,0 +1,52 @@
+import hashlib
+import os
+import time
+import zipfile
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+HASH_CHUNK_SIZE = 1 << 20  # Bytes hashed at a time
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """Identity of a file's content, recorded once the file is imported"""
+    path: str
+    size: int
+    mtime: float
+    content_hash: str
+
+@lru_cache(maxsize=1024)
+def _content_hash(path: str, size: int, mtime: float) -> str:
+    # Keyed on size and mtime as well, so a modified file is hashed again
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def fingerprint_file(file_path: str) -> FileFingerprint:
+    """
+    Fingerprint a file from its size, modification time and a BLAKE2b hash
+    of its content. The hash of an unchanged file is only computed once.
+    """
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    return FileFingerprint(path, stat.st_size, stat.st_mtime, _content_hash(path, stat.st_size, stat.st_mtime))
+
+def fingerprint_member(archive_path: str, member: str) -> FileFingerprint:
+    """
+    Fingerprint a member of a zip archive from its entry: uncompressed size,
+    date and CRC-32, without decompressing it
+    """
+    path = os.path.abspath(archive_path)
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(member)
+    return FileFingerprint(f"{path}:{member}", info.file_size, time.mktime(info.date_time + (0, 0, -1)),
+                           f"crc32:{info.CRC:08x}")
+
+def fingerprint_input(file_path: str, member: Optional[str] = None) -> FileFingerprint:
+    """Fingerprint a file, or a member of a zip archive when member is set"""
+    if member is not None:
+        return fingerprint_member(file_path, member)
+    return fingerprint_file(file_path)
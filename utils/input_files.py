@@ -0,0 +1,98 @@
+import gzip
+import io
+import os
+import zipfile
+from typing import BinaryIO, List, NamedTuple, Optional, TextIO
+
+# Suffixes of the files that can hold JSON records, possibly compressed
+JSON_SUFFIXES = ('.json', '.ndjson', '.jsonl')
+GZIP_SUFFIX = '.gz'
+ZSTD_SUFFIX = '.zst'
+ZIP_SUFFIX = '.zip'
+
+class InputFile(NamedTuple):
+    """A JSON input: a file, or a member of a zip archive"""
+    path: str
+    member: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """Stable identifier, used for checkpoints"""
+        return f"{self.path}:{self.member}" if self.member else self.path
+
+    @property
+    def display_name(self) -> str:
+        basename = os.path.basename(self.path)
+        return f"{basename}:{self.member}" if self.member else basename
+
+class _GzipReader(gzip.GzipFile):
+    """A GzipFile that also closes the stream it decompresses, which GzipFile leaves open"""
+
+    def __init__(self, stream: BinaryIO):
+        super().__init__(fileobj=stream, mode='rb')
+        self.stream = stream
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            self.stream.close()
+
+def _decompress(stream: BinaryIO, name: str) -> BinaryIO:
+    """
+    Wrap a stream in a streaming decompressor chosen from the file name.
+    Closing the decompressor closes the stream.
+    """
+    lower_name = name.lower()
+    if lower_name.endswith(GZIP_SUFFIX):
+        return _GzipReader(stream)
+    if lower_name.endswith(ZSTD_SUFFIX):
+        try:
+            import zstandard
+        except ImportError:
+            stream.close()
+            raise ImportError("Reading .zst files requires the zstandard package (pip install zstandard)")
+        # The buffer adds the line iteration that the zstandard reader lacks
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(
+            stream, read_across_frames=True, closefd=True))
+    return stream
+
+def open_binary(path: str, member: Optional[str] = None) -> BinaryIO:
+    """
+    Open a JSON input for reading, decompressing .gz and .zst files and
+    zip members on the fly
+    """
+    if member is None:
+        return _decompress(open(path, 'rb'), path)
+    with zipfile.ZipFile(path) as archive:
+        # The member stream keeps the archive file open after the ZipFile is closed
+        return _decompress(archive.open(member), member)
+
+def open_text(path: str, member: Optional[str] = None) -> TextIO:
+    return io.TextIOWrapper(open_binary(path, member), encoding='utf-8')
+
+def is_json_name(name: str) -> bool:
+    """Check a file name against the JSON suffixes, compressed or not"""
+    lower_name = name.lower()
+    for suffix in (GZIP_SUFFIX, ZSTD_SUFFIX):
+        if lower_name.endswith(suffix):
+            lower_name = lower_name[:-len(suffix)]
+    return lower_name.endswith(JSON_SUFFIXES)
+
+def zip_members(path: str) -> List[str]:
+    """JSON members of a zip archive, in archive order"""
+    with zipfile.ZipFile(path) as archive:
+        return [info.filename for info in archive.infolist()
+                if not info.is_dir() and is_json_name(info.filename)
+                and not os.path.basename(info.filename).startswith('.')
+                and not info.filename.startswith('__MACOSX/')]
+
+def expand_inputs(path: str) -> List[InputFile]:
+    """
+    Return the JSON inputs of a selected file: each JSON member of a zip
+    archive is an input of its own, any other file is a single input
+    """
+    path = os.path.abspath(path)
+    if path.lower().endswith(ZIP_SUFFIX):
+        return [InputFile(path, member) for member in zip_members(path)]
+    return [InputFile(path)]
@@ -0,0 +1,55 @@
+import json
+from functools import lru_cache
+from typing import Callable, NamedTuple, Optional, Tuple, Type
+from utils.logger import logger
+
+BACKEND_AUTO = 'auto'
+BACKEND_ORJSON = 'orjson'
+BACKEND_MSGSPEC = 'msgspec'
+BACKEND_JSON = 'json'
+# Tried in this order by BACKEND_AUTO, the standard library is always available
+BACKENDS = (BACKEND_ORJSON, BACKEND_MSGSPEC, BACKEND_JSON)
+
+class JsonBackend(NamedTuple):
+    """A JSON decoder and the exceptions it raises on invalid documents"""
+    name: str
+    loads: Callable[[str], object]
+    errors: Tuple[Type[Exception], ...]
+
+def _import_backend(name: str) -> Optional[JsonBackend]:
+    """Return the backend if its package is installed"""
+    try:
+        if name == BACKEND_ORJSON:
+            import orjson
+            return JsonBackend(name, orjson.loads, (orjson.JSONDecodeError,))
+        if name == BACKEND_MSGSPEC:
+            import msgspec
+            return JsonBackend(name, msgspec.json.Decoder().decode, (msgspec.DecodeError,))
+    except ImportError:
+        return None
+    if name == BACKEND_JSON:
+        return JsonBackend(name, json.loads, (json.JSONDecodeError,))
+    raise ValueError(f"Unknown JSON backend: {name}")
+
+def available_backends() -> Tuple[str, ...]:
+    """Names of the installed backends, fastest first"""
+    return tuple(name for name in BACKENDS if _import_backend(name) is not None)
+
+@lru_cache(maxsize=None)
+def get_backend(name: str = BACKEND_AUTO) -> JsonBackend:
+    """
+    Resolve a decoding backend by name. BACKEND_AUTO picks the fastest one
+    installed; a backend that is not installed falls back to the standard
+    library.
+    """
+    if name != BACKEND_AUTO:
+        backend = _import_backend(name)
+        if backend is not None:
+            return backend
+        logger.warning("JSON backend %s is not installed, using the standard library", name)
+        return _import_backend(BACKEND_JSON)
+    for candidate in BACKENDS:
+        backend = _import_backend(candidate)
+        if backend is not None:
+            logger.debug("JSON backend: %s", backend.name)
+            return backend
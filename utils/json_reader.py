@@ -0,0 +1,375 @@
+import codecs
+import json
+import os
+import re
+from typing import BinaryIO, Iterator, List, Optional, TextIO, Tuple
+from utils.json_backend import JsonBackend, get_backend, BACKEND_JSON
+from utils.input_files import open_binary, open_text
+from utils.config_manager import load_config, DEFAULT_CONFIG
+from utils.logger import logger
+
+CHUNK_SIZE = 1 << 16  # Characters read from the file at a time
+
+FORMAT_ARRAY = 'array'    # [{...}, {...}]
+FORMAT_OBJECT = 'object'  # A single (possibly pretty-printed) object
+FORMAT_NDJSON = 'ndjson'  # One object per line
+
+_decoder = json.JSONDecoder()
+_SEPARATORS = re.compile(r'[\s,]*')
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+
+# Used by count_records, _iter_array and _read_head to scan the structure without decoding values
+_NON_STRUCTURE_BYTES = bytes(b for b in range(256) if b not in b'[]{}"')
+_STRING_BYTES = re.compile(rb'"[^"]*"')
+
+def _read_head(stream: TextIO) -> Tuple[str, str, int]:
+    """
+    Read just enough of a stream to tell which layout it uses
+
+    Returns:
+        tuple: (format, buffered text, text position of the first value)
+    """
+    buffer = ''
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        buffer += chunk
+        stripped = buffer.lstrip('\ufeff \t\r\n')
+        if stripped or not chunk:
+            break
+    pos = len(buffer) - len(stripped)
+
+    if not stripped:
+        raise ValueError("No valid JSON objects found in file")
+    if stripped[0] == '[':
+        return FORMAT_ARRAY, buffer, pos + 1
+    if stripped[0] != '{':
+        raise ValueError("JSON must contain an object or array of objects")
+
+    # An object that closes at the end of its first line means one object per
+    # line. The line is not decoded: NDJSON with a broken first line is still
+    # read line by line, skipping that line.
+    while '\n' not in buffer[pos:]:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+    first_line = buffer[pos:].split('\n', 1)[0].rstrip()
+    structure, in_string = _structure(first_line, False)
+    # Strings never span lines, so a line ending inside one is a broken record too
+    if in_string or (first_line.endswith('}') and _closes_at_end(structure)):
+        return FORMAT_NDJSON, buffer, pos
+    return FORMAT_OBJECT, buffer, pos
+
+def _closes_at_end(structure: bytes) -> bool:
+    """Whether the value opening a structure is closed by its last bracket"""
+    depth = 0
+    for position, bracket in enumerate(structure):
+        depth += 1 if bracket in b'[{' else -1
+        if depth == 0:
+            return position == len(structure) - 1
+    return False
+
+def _iter_values(stream: TextIO, buffer: str, pos: int, in_array: bool) -> Iterator:
+    """Decode consecutive JSON values, reading more text only when a value is incomplete"""
+    read_size = CHUNK_SIZE
+    at_end = False
+    while True:
+        pos = _SEPARATORS.match(buffer, pos).end()
+        if pos < len(buffer):
+            if in_array and buffer[pos] == ']':
+                return
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Let the decoder report where the document is broken
+                if at_end:
+                    raise
+            else:
+                if at_end or not _may_be_truncated(value, buffer, end):
+                    yield value
+                    pos = end
+                    read_size = CHUNK_SIZE
+                    continue
+        elif at_end:
+            if in_array:
+                raise ValueError("Unterminated JSON array")
+            return
+
+        chunk = stream.read(read_size)
+        if not chunk:
+            at_end = True
+            continue
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        # Grow reads for values larger than a chunk so they are not re-parsed too often
+        read_size = max(read_size, len(buffer))
+
+def _may_be_truncated(value, buffer: str, end: int) -> bool:
+    """
+    Whether a value decoded from the buffer may continue in the next chunk:
+    it reaches the buffer end, or it is a number followed by what reaches
+    it, e.g. 0 decoded from '0.' when the chunk ends inside 0.5
+    """
+    if isinstance(value, (int, float)):
+        end = _NUMBER_TAIL.match(buffer, end).end()
+    return end == len(buffer)
+
+def _structure(text: str, in_string: bool) -> Tuple[bytes, bool]:
+    """
+    Return the brackets of a text that are outside strings, and whether it
+    ends inside a string. The text must not start or end in an escape.
+    """
+    # Bytes are translated much faster than text is searched
+    data = text.encode('utf-8')
+    if b'\\' in data:
+        # Without escaped backslashes and quotes every quote opens or closes a string
+        data = data.replace(b'\\\\', b'').replace(b'\\"', b'')
+    data = data.translate(None, _NON_STRUCTURE_BYTES)
+    if in_string:
+        data = b'"' + data
+    data = _STRING_BYTES.sub(b'', data.replace(b'""', b''))
+    # A quote left after dropping the strings opens one that the text does not close
+    quote = data.find(b'"')
+    if quote == -1:
+        return data, False
+    return data[:quote], True
+
+def _depth(structure: bytes) -> int:
+    return structure.count(b'{') + structure.count(b'[') - structure.count(b'}') - structure.count(b']')
+
+def _iter_array(stream: TextIO, buffer: str, pos: int, backend: JsonBackend) -> Iterator:
+    """
+    Decode the elements of an array with the backend, a chunk at a time.
+    The last element completed by each chunk is found from the brackets,
+    searching back from the end of the text, and every element up to it
+    is decoded with a single call. Only the text of the element left
+    incomplete is kept for the next chunk.
+    """
+    read_size = CHUNK_SIZE * 16
+    scanned = pos       # The text before this position has been scanned
+    depth = 0           # Nesting depth there, 0 between two elements
+    in_string = False
+    while True:
+        # Trailing backslashes may escape the next chunk, they are scanned with it
+        end = len(buffer)
+        while end > scanned and buffer[end - 1] == '\\':
+            end -= 1
+        structure, in_string = _structure(buffer[scanned:end], in_string)
+        depth += _depth(structure)
+        new_text, scanned = scanned, end
+
+        # An element ends at a bracket outside strings that returns to depth 0, the
+        # array at one that returns to -1. The text before the new one holds neither.
+        close = end
+        while True:
+            close = max(buffer.rfind('}', new_text, close), buffer.rfind(']', new_text, close))
+            if close == -1:
+                break
+            after, after_in_string = _structure(buffer[close + 1:end], False)
+            # Scanned from outside a string, the rest of the text ends in the
+            # same state only if the bracket is outside a string too
+            if after_in_string == in_string and depth - _depth(after) <= 0:
+                break
+
+        if close != -1:
+            start = _SEPARATORS.match(buffer, pos).end()
+            if depth - _depth(after) == 0:
+                yield from backend.loads('[' + buffer[start:close + 1] + ']')
+                pos = close + 1
+            else:
+                elements = buffer[start:close].rstrip(' \t\r\n,')
+                if elements:
+                    yield from backend.loads('[' + elements + ']')
+                return
+
+        chunk = stream.read(read_size)
+        if not chunk:
+            raise ValueError("Unterminated JSON array")
+        buffer = buffer[pos:] + chunk
+        scanned -= pos
+        pos = 0
+        # Grow reads for elements larger than a chunk so they are not copied too often
+        read_size = max(read_size, len(buffer))
+
+def _iter_lines(stream: TextIO, buffer: str, pos: int, backend: JsonBackend) -> Iterator[dict]:
+    """Decode one object per line, skipping lines that are not valid JSON"""
+    def lines():
+        head, newline, rest = buffer[pos:].rpartition('\n')
+        if newline:
+            yield from head.split('\n')
+        for line in stream:
+            if rest:
+                line, rest = rest + line, ''
+            yield line
+        if rest:
+            yield rest
+
+    skipped = 0
+    for line in lines():
+        line = line.strip()
+        if line:
+            try:
+                yield backend.loads(line)
+            except backend.errors:
+                skipped += 1
+    if skipped:
+        logger.debug("Skipped %d invalid lines", skipped)
+
+def iter_stream(stream: TextIO, backend: Optional[JsonBackend] = None) -> Iterator[dict]:
+    """
+    Yield records one at a time from a text stream holding a JSON array,
+    a single object or one object per line
+
+    Args:
+        stream: Text stream positioned at the start of the document
+        backend: Decoder of the lines of NDJSON and of the elements of
+            arrays, the configured one when None. The standard library
+            decodes arrays and objects straight from the text, the only
+            decoder that can stop at the end of a value in the middle of a
+            buffer; the other backends decode the array elements that
+            _iter_array slices out of it.
+    """
+    backend = backend or default_backend()
+    data_format, buffer, pos = _read_head(stream)
+    if data_format == FORMAT_NDJSON:
+        values = _iter_lines(stream, buffer, pos, backend)
+    elif data_format == FORMAT_ARRAY and backend.name != BACKEND_JSON:
+        values = _iter_array(stream, buffer, pos, backend)
+    else:
+        values = _iter_values(stream, buffer, pos, in_array=data_format == FORMAT_ARRAY)
+
+    for value in values:
+        if isinstance(value, dict):
+            yield value
+        else:
+            logger.debug("Skipped non-object JSON value of type %s", type(value).__name__)
+
+def default_backend() -> JsonBackend:
+    """The decoding backend set in the configuration"""
+    return get_backend(load_config().get('json_backend', DEFAULT_CONFIG['json_backend']))
+
+def iter_records(file_path: str, backend: Optional[JsonBackend] = None,
+                 member: Optional[str] = None) -> Iterator[dict]:
+    """
+    Stream the records of a CDLI JSON export without loading the whole file,
+    decompressing .gz and .zst files on the fly
+
+    Args:
+        file_path: Path to JSON file, or to a zip archive when member is set
+        backend: Decoding backend, the configured one when None
+        member: Name of the JSON file inside a zip archive
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    with open_text(file_path, member) as file:
+        yield from iter_stream(file, backend)
+
+def detect_format(file_path: str, member: Optional[str] = None) -> str:
+    """
+    Detect the layout of a JSON file from its first bytes
+
+    Returns:
+        str: FORMAT_ARRAY, FORMAT_OBJECT or FORMAT_NDJSON
+    """
+    with open_text(file_path, member) as file:
+        return _read_head(file)[0]
+
+def _count_lines(file: BinaryIO, backend: JsonBackend) -> int:
+    """
+    Count the lines holding an object, by the rules _iter_lines decodes
+    them with: a byte order mark before the first line is ignored and lines
+    that are not valid JSON are skipped
+    """
+    count = 0
+    for number, line in enumerate(file):
+        if number == 0 and line.startswith(codecs.BOM_UTF8):
+            line = line[len(codecs.BOM_UTF8):]
+        line = line.strip()
+        if line.startswith(b'{'):
+            try:
+                count += isinstance(backend.loads(line), dict)
+            except backend.errors:
+                pass
+    return count
+
+def _count_objects(file: BinaryIO, record_depth: int) -> int:
+    """
+    Count the objects opened at a nesting depth from the brackets, ignoring
+    those inside strings: 1 for the elements of an array, 0 for a sequence
+    of objects. Chunks are cut anywhere: whether the previous chunk ended
+    inside a string or on an escaping backslash is carried over, so
+    minified single-line arrays are scanned in constant memory too.
+    """
+    count = 0
+    depth = 0
+    in_string = False
+    escaped = False
+    while True:
+        chunk = file.read(CHUNK_SIZE * 16)
+        if not chunk:
+            return count
+        if escaped:
+            # Escaped by the backslash that ended the previous chunk
+            chunk = chunk[1:]
+        # An odd run of trailing backslashes escapes the first byte of the next chunk
+        escaped = (len(chunk) - len(chunk.rstrip(b'\\'))) % 2 == 1
+        if escaped:
+            chunk = chunk[:-1]
+        # Without escaped backslashes and quotes every quote opens or closes a string
+        if b'\\' in chunk:
+            chunk = chunk.replace(b'\\\\', b'').replace(b'\\"', b'')
+        # Keep only quotes and brackets, reopening a string left open by the previous chunk
+        text = chunk.translate(None, _NON_STRUCTURE_BYTES)
+        if in_string:
+            text = b'"' + text
+        text = _STRING_BYTES.sub(b'', text.replace(b'""', b''))
+        # A quote left after dropping the strings opens one that continues in the next chunk
+        quote = text.find(b'"')
+        in_string = quote != -1
+        if in_string:
+            text = text[:quote]
+        for bracket in text:
+            if bracket in b'[{':
+                if depth == record_depth and bracket == ord('{'):
+                    count += 1
+                depth += 1
+            else:
+                depth -= 1
+
+def count_records(file_path: str, data_format: Optional[str] = None, member: Optional[str] = None,
+                  backend: Optional[JsonBackend] = None) -> int:
+    """
+    Count the records of a JSON file with a quick scan of its structure.
+    Arrays are counted without decoding them; each line of NDJSON is
+    decoded so that the count matches the records iter_records yields.
+
+    Args:
+        file_path: Path to JSON file, or to a zip archive when member is set
+        data_format: Layout of the file, detected when not given
+        member: Name of the JSON file inside a zip archive
+        backend: Decoder of the lines of NDJSON, the configured one when None
+    """
+    data_format = data_format or detect_format(file_path, member)
+    with open_binary(file_path, member) as file:
+        if data_format == FORMAT_NDJSON:
+            return _count_lines(file, backend or default_backend())
+        # A file may hold several (pretty-printed) objects one after another
+        return _count_objects(file, 1 if data_format == FORMAT_ARRAY else 0)
+
+def load_records(file_path: str, member: Optional[str] = None) -> List[dict]:
+    """
+    Load the records of a CDLI JSON export, handling single objects,
+    arrays and one object per line
+
+    Args:
+        file_path: Path to JSON file
+        member: Name of the JSON file inside a zip archive
+
+    Returns:
+        list: Decoded records
+    """
+    records = list(iter_records(file_path, member=member))
+    if not records:
+        raise ValueError("No valid JSON objects found in file")
+    return records
@@ -1,60 +1,136 @@
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
 from .config_manager import load_config
 from datetime import datetime
 
+LOGGER_NAME = 'cdli-json-export-processor-app'
+LOG_DIR = 'logs'
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Queue the records as they are: the message is merged with its arguments
+    by the listener thread when the record is written, not by the caller.
+    Log arguments must therefore not be modified after the call.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+class _SetupOnFirstRecord(logging.Handler):
+    """
+    Stands in for the handlers until the first record: it sets the logger up
+    from the configuration, then passes the record on (or drops it when
+    logging is off). Importing the logger therefore reads no configuration.
+    """
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        logger = Logger.get_logger()
+        if logger.isEnabledFor(record.levelno):
+            logger.handle(record)
+        return True
+
 class Logger:
     _instance = None
+    _lock = threading.Lock()
+    _listener: Optional[QueueListener] = None
 
     def __init__(self):
         Logger._instance = self._setup_logger()  # Store logger in class variable
 
-    def _setup_logger(self, name: str = 'cdli-json-export-processor-app', log_level=logging.INFO) -> logging.Logger:
-        """Enhanced logger setup that respects config settings"""
-        # Check config first
-        config = load_config()
-        if not config.get('logging_enabled', False):
-            null_logger = logging.getLogger('null')
-            null_logger.addHandler(logging.NullHandler())
-            return null_logger
-            
+    @classmethod
+    def _setup_logger(cls, name: str = LOGGER_NAME, log_level=logging.INFO,
+                      enabled: Optional[bool] = None, log_dir: str = LOG_DIR,
+                      console: bool = True) -> logging.Logger:
+        """
+        Set up the application logger, following the logging_enabled setting
+        unless `enabled` is given.
+
+        The logger only puts records on a queue; a listener thread formats
+        them and writes them to the log file and the console, so logging
+        never waits on formatting, disk or terminal I/O. A disabled logger rejects
+        records before their message is even built.
+        """
+        if enabled is None:
+            enabled = load_config().get('logging_enabled', False)
+
+        logger = logging.getLogger(name)
+        cls._stop_listener()
+        # Remove existing handlers to prevent duplicates, the list being
+        # iterated when the first record triggers the setup is left alone
+        old_handlers, logger.handlers = logger.handlers, []
+        for handler in old_handlers:
+            handler.close()
+        # Records never reach the root logger, whose last resort handler prints to stderr
+        logger.propagate = False
+        logger.disabled = not enabled
+        logger.setLevel(log_level)
+        if not enabled:
+            return logger
+
         # Create logs directory if it doesn't exist
-        os.makedirs('logs', exist_ok=True)
-        
+        os.makedirs(log_dir, exist_ok=True)
+
         # Generate timestamped log filename
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        log_file = f'logs/{name}_{timestamp}.log'
-        
-        logger = logging.getLogger(name)
-        logger.setLevel(log_level)
-        
-        # Remove existing handlers to prevent duplicates
-        logger.handlers.clear()
-        
+        log_file = os.path.join(log_dir, f'{name}_{timestamp}.log')
+
         # File handler with rotation
         file_handler = RotatingFileHandler(log_file)
-        
+
         # Detailed formatter
         formatter = logging.Formatter(
             '%(asctime)s | %(levelname)-8s | %(filename)s:%(lineno)d | %(funcName)s | %(message)s'
         )
-        
+
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        
+
+        handlers = [file_handler]
+
         # Optional console handler for development
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-        
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
+
+        log_queue = queue.SimpleQueue()
+        cls._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        cls._listener.start()
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+
         return logger
 
+    @classmethod
+    def _stop_listener(cls) -> None:
+        """Write the queued records and close the handlers"""
+        listener, cls._listener = cls._listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+
+    @classmethod
+    def configure(cls, enabled: bool, log_dir: str = LOG_DIR, console: bool = True) -> logging.Logger:
+        """Turn logging on or off while the application runs, the logger object stays the same"""
+        with cls._lock:
+            cls._instance = cls._setup_logger(enabled=enabled, log_dir=log_dir, console=console)
+        return cls._instance
+
     @classmethod
     def get_logger(cls):
-        if cls._instance is None:
-            Logger()  # Creates instance and sets _instance
+        with cls._lock:
+            if cls._instance is None:
+                Logger()  # Creates instance and sets _instance
         return cls._instance
 
-# Create singleton instance
-logger = Logger.get_logger()
\ No newline at end of file
+# The singleton is set up by the first record it receives
+logger = logging.getLogger(LOGGER_NAME)
+logger.propagate = False
+logger.setLevel(logging.INFO)
+logger.addHandler(_SetupOnFirstRecord())
+# Records still queued when the application exits are written out
+atexit.register(Logger._stop_listener)
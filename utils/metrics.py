@@ -0,0 +1,134 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+from utils.logger import logger
+
+# Directory of the metrics files requested with --metrics when metrics_dir is not set
+DEFAULT_METRICS_DIR = 'metrics'
+
+@dataclass
+class StageStats:
+    """Cumulative time spent in a stage, excluding the stages nested in it"""
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+class ImportMetrics:
+    """
+    Collects the time spent in each stage of an import, overall and per
+    batch, along with the number of SQL statements executed per batch.
+
+    Stages may be nested: the time of an inner stage is only counted once,
+    in the inner stage, so the stage totals add up to the measured time.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now().isoformat()
+        self.stages: Dict[str, StageStats] = {}
+        self.batches: List[dict] = []
+        self.queries = 0
+        self._stack: List[list] = []  # [name, start, time spent in nested stages]
+        self._batch: Optional[dict] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as the given stage"""
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+            self._record(name, elapsed - frame[2])
+
+    def _record(self, name: str, seconds: float) -> None:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        stats.count += 1
+        stats.seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        if self._batch is not None:
+            batch_stages = self._batch['stages']
+            batch_stages[name] = batch_stages.get(name, 0.0) + seconds
+
+    def timed(self, iterable: Iterable, name: str) -> Iterator:
+        """Iterate, timing each step of the iterator as the given stage"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def start_batch(self, number: int) -> None:
+        """Attribute the following stages and queries to a batch, before its records are read"""
+        self._batch = {
+            'batch': number,
+            'queries': 0,
+            'stages': {},
+            'start': time.perf_counter(),
+        }
+
+    def end_batch(self, source: str, records: int, failed: bool = False) -> None:
+        batch = self._batch
+        if batch is None:
+            return
+        batch['source'] = source
+        batch['records'] = records
+        batch['seconds'] = round(time.perf_counter() - batch.pop('start'), 6)
+        batch['stages'] = {name: round(seconds, 6) for name, seconds in batch['stages'].items()}
+        batch['failed'] = failed
+        self.batches.append(batch)
+        self._batch = None
+
+    def discard_batch(self) -> None:
+        """Drop a batch started for records that never came"""
+        self._batch = None
+
+    def count_query(self) -> None:
+        """Count an SQL statement, see database.engine.count_queries"""
+        self.queries += 1
+        if self._batch is not None:
+            self._batch['queries'] += 1
+
+    def stage_seconds(self) -> Dict[str, float]:
+        return {name: stats.seconds for name, stats in self.stages.items()}
+
+    def summary_lines(self) -> List[str]:
+        """Stage totals, slowest first, for logs and summaries"""
+        total = sum(stats.seconds for stats in self.stages.values()) or 1.0
+        return [f"{name}: {stats.seconds:.2f}s ({stats.seconds / total:.0%}, {stats.count} calls)"
+                for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].seconds)]
+
+    def to_dict(self, **extra) -> dict:
+        return {
+            'started_at': self.started_at,
+            **extra,
+            'queries': self.queries,
+            'stages': {name: asdict(stats) for name, stats in self.stages.items()},
+            'batches': self.batches,
+        }
+
+    def write(self, path: str, **extra) -> None:
+        """Write the metrics as JSON, extra keys are added at the top level"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(**extra), file, indent=2)
+        logger.info("Metrics written to %s", path)
+
+def default_metrics_path(directory: str) -> str:
+    """Timestamped metrics file in the given directory, like the log files"""
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(directory, f'import_{timestamp}.json')
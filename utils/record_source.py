@@ -0,0 +1,59 @@
+import os
+from typing import Iterator, Optional, Sequence
+from utils.fingerprint import FileFingerprint
+from utils.input_files import InputFile
+from utils.json_reader import count_records, detect_format, iter_records
+
+class RecordSource:
+    """The records of one input file, imported and checkpointed as a unit"""
+
+    def __init__(self, name: str, records: Sequence[dict], fingerprint: Optional[FileFingerprint] = None):
+        """
+        Args:
+            name: Stable identifier of the source, e.g. the file path
+            records: Decoded records
+            fingerprint: Fingerprint of the file, recorded once it is imported
+        """
+        self.name = name
+        self.records = records
+        self.fingerprint = fingerprint
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.records)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r}, {len(self)} records)"
+
+class FileRecordSource(RecordSource):
+    """
+    The records of a JSON file, decoded only when the importer iterates
+    over them and projected on the fields it reads. The layout and the
+    record count come from a quick scan, so a selected file costs almost
+    no memory.
+    """
+
+    def __init__(self, file_path: str, fingerprint: Optional[FileFingerprint] = None,
+                 member: Optional[str] = None):
+        """
+        Args:
+            file_path: Path to the JSON file, plain, .gz or .zst, or to a zip archive
+            fingerprint: Fingerprint of the file, recorded once it is imported
+            member: Name of the JSON file inside the zip archive
+        """
+        self.input = InputFile(os.path.abspath(file_path), member)
+        super().__init__(self.input.name, None, fingerprint)
+        self.path = self.input.path
+        self.member = member
+        self.format = detect_format(self.path, member)
+        self.count = count_records(self.path, self.format, member)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[dict]:
+        # Imported here, the projection pulls in SQLAlchemy and the models
+        from database.projection import project_records
+        return project_records(iter_records(self.path, member=self.member))
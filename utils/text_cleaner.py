@@ -1,58 +1,101 @@
 import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# Patterns compiled once instead of on every line
+_REPLACEMENTS = {
+    "sz": "š",
+    "s,": "ṣ",
+    "t,": "ṭ",
+    "h": "ḫ"
+}
+_REPLACEMENTS_PATTERN = re.compile('|'.join(re.escape(k) for k in _REPLACEMENTS))
+_LOGOGRAM_PATTERN = re.compile(r'_(.*?)_')
+_FIRST_TOKEN_PATTERN = re.compile(r'\S*')
+# Signs are separated by hyphens, dots, plus signs and colons; determinatives keep their braces
+_SIGN_PATTERN = re.compile(r'\{[^{}\s]*\}|[^\s{}.:+-]+')
+# Damage, collation and correction marks around signs
+_EDITORIAL_PATTERN = re.compile(r"[\[\]#?!*<>⸢⸣]")
+# Structure (@), state ($), comment (#) and link (>>) lines hold no signs
+_NON_TEXT_PREFIXES = ('@', '$', '#', '&', '>>', '=')
+
+class ParsedAtf(NamedTuple):
+    """Texts extracted from raw ATF data"""
+    cleaned_transliteration: Optional[str]
+    existing_translation: Optional[str]
 
 def replace_characters(text: str) -> str:
     """Replace specific characters according to transliteration rules"""
-    replacements = {
-        "sz": "š",
-        "s,": "ṣ",
-        "t,": "ṭ",
-        "h": "ḫ"
-    }
-    pattern = re.compile('|'.join(re.escape(k) for k in replacements))
-    text = pattern.sub(lambda m: replacements[m.group(0)], text)
-    
-    return re.sub(r'_(.*?)_', lambda m: m.group(1).upper(), text)
+    text = _REPLACEMENTS_PATTERN.sub(lambda m: _REPLACEMENTS[m.group(0)], text)
 
-def extract_cleaned_transliteration(raw_atf: str) -> str:
-    """Extract and clean transliteration from raw ATF data"""
+    return _LOGOGRAM_PATTERN.sub(lambda m: m.group(1).upper(), text)
+
+def parse_atf(raw_atf: str) -> ParsedAtf:
+    """
+    Extract the cleaned transliteration and the existing translations from
+    raw ATF data in a single pass over its lines.
+
+    Each translation line is prefixed with the first token (the line number)
+    of the closest preceding line that is not a comment.
+    """
     if not raw_atf:
-        return None
+        return ParsedAtf(None, None)
 
     cleaned_lines = []
+    translation_lines = []
+    line_prefix = None
+
     for line in raw_atf.splitlines():
         stripped_line = line.strip()
-        
-        if any(stripped_line.startswith(prefix) for prefix in ["#tr.", "\u0026P", "#"]):
+
+        if stripped_line.startswith("#"):
+            if line_prefix and stripped_line.startswith("#tr.") and not stripped_line.startswith("#tr.ts:"):
+                cleaned_translation = stripped_line.split(":", 1)[1].strip()
+                translation_lines.append(f"{line_prefix} {cleaned_translation}")
             continue
 
-        cleaned_line = replace_characters(stripped_line)
-        cleaned_lines.append(cleaned_line)
+        line_prefix = _FIRST_TOKEN_PATTERN.match(stripped_line).group()
+        if not stripped_line.startswith("&P"):
+            cleaned_lines.append(stripped_line)
 
-    return "\n".join(cleaned_lines) if cleaned_lines else None
+    # Replacements never span lines, so the whole text is rewritten at once
+    return ParsedAtf(
+        replace_characters("\n".join(cleaned_lines)) if cleaned_lines else None,
+        "\n".join(translation_lines) if translation_lines else None
+    )
+
+def extract_cleaned_transliteration(raw_atf: str) -> str:
+    """Extract and clean transliteration from raw ATF data"""
+    return parse_atf(raw_atf).cleaned_transliteration
 
 def extract_existing_translation(raw_atf: str) -> str:
     """Extract existing translations from raw ATF data"""
-    if not raw_atf:
-        return None
-
-    translation_lines = []
-    raw_atf_lines = raw_atf.splitlines()
-    nearest_prefix = None
+    return parse_atf(raw_atf).existing_translation
 
-    for i, line in enumerate(raw_atf_lines):
-        stripped_line = line.strip()
+def clean_atf_batch(raw_atfs: List[str]) -> List[ParsedAtf]:
+    """Clean several ATF texts at once, used to send whole batches to worker processes"""
+    return [parse_atf(raw_atf) for raw_atf in raw_atfs]
 
-        if stripped_line.startswith("#tr.") and not stripped_line.startswith("#tr.ts:"):
-            nearest_prefix = find_nearest_prefix(raw_atf_lines, i)
-            if nearest_prefix:
-                cleaned_translation = stripped_line.split(":", 1)[1].strip()
-                translation_lines.append(f"{nearest_prefix} {cleaned_translation}")
+def split_signs(text: str) -> List[str]:
+    """
+    Split transliterated text into its signs, e.g. "{d}en-lil2 lugal-e" into
+    {d}, en, lil2, lugal and e. Editorial marks are dropped.
+    """
+    return _SIGN_PATTERN.findall(_EDITORIAL_PATTERN.sub('', text))
 
-    return "\n".join(translation_lines) if translation_lines else None
-
-def find_nearest_prefix(lines: list, current_index: int) -> str:
-    """Find the nearest non-comment prefix in previous lines"""
-    for i in range(current_index - 1, -1, -1):
-        if not lines[i].strip().startswith("#"):
-            return re.split(r'\s+', lines[i].strip())[0]
-    return None
+def sign_lines(cleaned_transliteration: Optional[str]) -> Iterator[Tuple[int, List[str]]]:
+    """
+    Yield the signs of each text line of a cleaned transliteration with the
+    line's 1-based position in the text, after its label (e.g. "1'.")
+    """
+    if not cleaned_transliteration:
+        return
+    for position, line in enumerate(cleaned_transliteration.split("\n"), start=1):
+        line = line.strip()
+        if not line or line.startswith(_NON_TEXT_PREFIXES):
+            continue
+        label = _FIRST_TOKEN_PATTERN.match(line).group()
+        if label.endswith('.'):
+            line = line[len(label):]
+        signs = split_signs(line)
+        if signs:
+            yield position, signs